@@ -0,0 +1,138 @@
+import os
+import shutil
+from collections import deque
+
+from screenshot_pipeline import ScreenshotOptions
+
+CAPTURE_MODES = ('always', 'on-failure', 'off')
+
+
+def attempt_folder(folder, attempt):
+    """Where a test's attempt records into: folder itself for the first run, folder/attempt-N for a retry
+
+    A retry that passes clears only its own recordings, so a failed attempt's video survives.
+    """
+    return folder if attempt == 1 else os.path.join(folder, f'attempt-{attempt}')
+
+
+class CapturePolicy:
+    """What to capture per test: each of video, screenshots and trace is always, on-failure or off"""
+
+    def __init__(self, video='on-failure', screenshots='on-failure', trace='off', ring_size=12):
+        for name, mode in (('video', video), ('screenshots', screenshots), ('trace', trace)):
+            if mode not in CAPTURE_MODES:
+                raise ValueError(f"Invalid {name} capture mode '{mode}', expected one of {', '.join(CAPTURE_MODES)}")
+        self.video = video
+        self.screenshots = screenshots
+        self.trace = trace
+        self.ring_size = ring_size
+
+    def __repr__(self):
+        return f"CapturePolicy(video={self.video}, screenshots={self.screenshots}, trace={self.trace})"
+
+
+class CaptureSession:
+    """Per-test artifact capture following a CapturePolicy
+
+    In on-failure mode screenshots are kept in a ring buffer of the most
+    recent frames and only written to disk if the test fails; recorded
+    video is discarded when the test passes, and a Playwright trace is only
+    saved to trace.zip when the test fails. grab(page, options, target)
+    returns the image bytes; with a writer (see screenshot_pipeline.py) files
+    are written in the background.
+    """
+
+    def __init__(self, policy, screenshots_folder, videos_folder, grab, trace_path=None, options=None, writer=None):
+        self.policy = policy
+        self.options = options or ScreenshotOptions()
+        self.writer = writer
+        self.screenshots_folder = screenshots_folder
+        self.videos_folder = videos_folder
+        self.trace_path = trace_path
+        self.grab = grab
+        self.frames = deque(maxlen=policy.ring_size)
+
+    def context_options(self):
+        if self.policy.video == 'off':
+            return {}
+        return {
+            'record_video_dir': self.videos_folder,
+            'record_video_size': {"width": 1280, "height": 720},
+        }
+
+    def start_tracing(self, context):
+        if self.policy.trace != 'off':
+            context.tracing.start(screenshots=True, snapshots=True, sources=True)
+
+    async def start_tracing_async(self, context):
+        if self.policy.trace != 'off':
+            await context.tracing.start(screenshots=True, snapshots=True, sources=True)
+
+    def _keep_trace(self, failed):
+        return self.policy.trace == 'always' or (self.policy.trace == 'on-failure' and failed)
+
+    def stop_tracing(self, context, failed):
+        """Stop tracing before the context closes, exporting trace.zip only if the policy keeps it"""
+        if self.policy.trace == 'off':
+            return
+        if self._keep_trace(failed):
+            context.tracing.stop(path=self.trace_path)
+        else:
+            context.tracing.stop()
+
+    async def stop_tracing_async(self, context, failed):
+        if self.policy.trace == 'off':
+            return
+        if self._keep_trace(failed):
+            await context.tracing.stop(path=self.trace_path)
+        else:
+            await context.tracing.stop()
+
+    def _path(self, name):
+        return os.path.join(self.screenshots_folder, name)
+
+    def _write(self, name, data):
+        if self.writer:
+            self.writer.submit(self._path(name), data)
+        else:
+            with open(self._path(name), 'wb') as f:
+                f.write(data)
+
+    def _keep(self, name, data):
+        if not data:
+            return
+        name = self.options.filename(name)
+        if self.policy.screenshots == 'always':
+            self._write(name, data)
+        else:
+            self.frames.append((name, data))
+
+    def screenshot(self, page, name, target=None):
+        """Capture the page (or just target, when clipping to elements); keep or buffer it per the policy"""
+        if self.policy.screenshots != 'off':
+            self._keep(name, self.grab(page, self.options, target))
+
+    async def screenshot_async(self, page, name, target=None):
+        if self.policy.screenshots != 'off':
+            self._keep(name, await self.grab(page, self.options, target))
+
+    def flush_frames(self):
+        """Write out buffered frames (called when a test fails)"""
+        if not self.frames:
+            return 0
+        os.makedirs(self.screenshots_folder, exist_ok=True)
+        written = 0
+        while self.frames:
+            name, data = self.frames.popleft()
+            self._write(name, data)
+            written += 1
+        return written
+
+    def finish(self, failed):
+        """Apply the policy once the test's context is closed and its video finalized"""
+        if failed:
+            self.flush_frames()
+        else:
+            self.frames.clear()
+            if self.policy.video == 'on-failure' and os.path.isdir(self.videos_folder):
+                shutil.rmtree(self.videos_folder, ignore_errors=True)
@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import zipfile
+import threading
+
+ARTIFACTS_DIR = 'artifacts'
+RUNS_DIR = os.path.join(ARTIFACTS_DIR, 'runs')
+RUN_FILE = 'run.json'  # written into a run's folder when the run finishes
+MANIFEST = 'manifest.json'
+DEFAULT_KEEP_RUNS = 10
+DEFAULT_MAX_GB = 5.0
+STALE_HOURS = 24  # an unfinished run older than this crashed or was killed
+# Already compressed, so stored in archives as they are
+STORED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webm', '.zip', '.gz')
+
+# Each run writes into artifacts/runs/<run id>/ (run ids sort by start time). Finished runs are packed
+# into artifacts/runs/<run id>.zip, where every distinct file content is stored once as objects/<sha256>
+# and manifest.json maps the run's paths to them, then the oldest runs are deleted past the retention
+# limits. All of that happens on a background thread, so starting a run never waits on the disk.
+
+
+def new_run_id():
+    return time.strftime('%Y%m%d-%H%M%S') + f"-{os.getpid()}"
+
+
+def start_run(runs_dir=RUNS_DIR):
+    """Create a folder for this run's artifacts and return its path"""
+    run_dir = os.path.join(runs_dir, new_run_id())
+    os.makedirs(run_dir, exist_ok=True)
+    return run_dir
+
+
+def finish_run(run_dir, results):
+    """Mark the run finished, which lets later runs pack it"""
+    summary = {
+        'run_id': os.path.basename(run_dir),
+        'finished': round(time.time()),
+        'total': len(results),
+        'failed': sum(1 for r in results if r['status'] == 'FAILED'),
+    }
+    path = os.path.join(run_dir, RUN_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _files(folder):
+    for root, _, names in os.walk(folder):
+        for name in names:
+            yield os.path.join(root, name)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pack_run(run_dir):
+    """Pack a run folder into <run dir>.zip, each distinct file stored once, and delete the folder
+
+    Returns (archive path, files, distinct contents).
+    """
+    archive = run_dir.rstrip(os.sep) + '.zip'
+    tmp_path = f"{archive}.{os.getpid()}.tmp"
+    manifest, stored = {}, set()
+    by_inode = {}  # screenshots deduplicated during the run are hard links: hash them once
+    try:
+        with zipfile.ZipFile(tmp_path, 'w') as zf:
+            for file_path in _files(run_dir):
+                stat = os.stat(file_path)
+                digest = by_inode.get((stat.st_dev, stat.st_ino))
+                if digest is None:
+                    digest = by_inode[(stat.st_dev, stat.st_ino)] = _sha256(file_path)
+                relative = os.path.relpath(file_path, run_dir).replace(os.sep, '/')
+                if digest not in stored:
+                    stored.add(digest)
+                    compression = zipfile.ZIP_STORED if file_path.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+                    zf.write(file_path, f"objects/{digest}", compress_type=compression)
+                manifest[relative] = digest
+            zf.writestr(MANIFEST, json.dumps({'run_id': os.path.basename(run_dir), 'files': manifest}, indent=2),
+                        compress_type=zipfile.ZIP_DEFLATED)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, archive)
+    shutil.rmtree(run_dir, ignore_errors=True)
+    return archive, len(manifest), len(stored)
+
+
+def unpack_run(archive, dest=None):
+    """Restore a packed run's files into dest (by default the run's folder next to the archive); returns dest"""
+    dest = dest or archive[:-len('.zip')]
+    with zipfile.ZipFile(archive) as zf:
+        manifest = json.loads(zf.read(MANIFEST))
+        for relative, digest in manifest['files'].items():
+            path = os.path.join(dest, *relative.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with zf.open(f"objects/{digest}") as src, open(path, 'wb') as out:
+                shutil.copyfileobj(src, out)
+    return dest
+
+
+class RetentionPolicy:
+    """How many runs, and how much disk, artifacts/runs may hold; the newest runs are kept"""
+
+    def __init__(self, keep_runs=DEFAULT_KEEP_RUNS, max_gb=DEFAULT_MAX_GB):
+        if keep_runs < 1:
+            raise ValueError("At least one run has to be kept")
+        if max_gb <= 0:
+            raise ValueError("The artifacts size limit must be more than 0 GB")
+        self.keep_runs = keep_runs
+        self.max_gb = max_gb
+
+    def __repr__(self):
+        return f"RetentionPolicy(keep_runs={self.keep_runs}, max_gb={self.max_gb})"
+
+    def expired(self, runs):
+        """The (run id, path, size) entries to delete; runs are given newest first, and the newest is always kept"""
+        limit = self.max_gb * 1024 ** 3
+        kept, total = 0, 0
+        expired = []
+        for run in runs:
+            if kept and (kept >= self.keep_runs or total + run[2] > limit):
+                expired.append(run)
+            else:
+                kept += 1
+                total += run[2]
+        return expired
+
+
+def _stale(path):
+    return time.time() - os.path.getmtime(path) > STALE_HOURS * 3600
+
+
+def maintain_runs(policy, runs_dir=RUNS_DIR):
+    """Pack finished run folders, then delete the oldest runs past the policy's limits
+
+    Folders of runs still going (no run.json yet, and not stale) are left
+    alone, so runs sharing a workspace never pack or delete each other's files.
+    Returns {'packed', 'deleted', 'freed_bytes', 'errors'}.
+    """
+    stats = {'packed': 0, 'deleted': 0, 'freed_bytes': 0, 'errors': 0}
+    if not os.path.isdir(runs_dir):
+        return stats
+    for name in sorted(os.listdir(runs_dir)):
+        path = os.path.join(runs_dir, name)
+        try:
+            if name.endswith('.tmp'):
+                # An archive whose packing was cut short
+                if _stale(path):
+                    os.remove(path)
+            elif os.path.isdir(path):
+                if os.path.exists(path + '.zip'):
+                    # Packed already (or unpacked again for a look): the archive has everything
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.exists(os.path.join(path, RUN_FILE)) or _stale(path):
+                    pack_run(path)
+                    stats['packed'] += 1
+        except OSError as e:
+            stats['errors'] += 1
+            print(f"⚠️  Could not pack {name}: {str(e)}")
+
+    archives = sorted((name for name in os.listdir(runs_dir) if name.endswith('.zip')), reverse=True)
+    runs = [(name[:-len('.zip')], os.path.join(runs_dir, name), os.path.getsize(os.path.join(runs_dir, name))) for name in archives]
+    for run_id, path, size in policy.expired(runs):
+        try:
+            os.remove(path)
+            stats['deleted'] += 1
+            stats['freed_bytes'] += size
+        except OSError as e:
+            stats['errors'] += 1
+            print(f"⚠️  Could not delete run {run_id}: {str(e)}")
+    return stats
+
+
+class Maintenance(threading.Thread):
+    """maintain_runs on a background thread; stats holds its result once it is done"""
+
+    def __init__(self, policy, runs_dir=RUNS_DIR):
+        super().__init__(name='artifact-maintenance')
+        self.policy = policy
+        self.runs_dir = runs_dir
+        self.stats = None
+
+    def run(self):
+        self.stats = maintain_runs(self.policy, self.runs_dir)
+
+
+def start_maintenance(policy=None, runs_dir=RUNS_DIR):
+    maintenance = Maintenance(policy or RetentionPolicy(), runs_dir)
+    maintenance.start()
+    return maintenance
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlparse
+
+ASSET_CACHE_DIR = '.asset_cache'
+STATIC_RESOURCE_TYPES = {'script', 'stylesheet', 'font', 'image'}
+# Hop-by-hop / encoding headers that no longer match a body Playwright has already decoded
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+ANALYTICS_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'connect.facebook.net',
+    'hotjar.com', 'segment.io', 'segment.com', 'mixpanel.com', 'clarity.ms', 'sentry.io',
+)
+BLOCK_MODES = ('none', 'analytics', 'third-party')
+
+
+class AssetCache:
+    """Static responses shared by every context in this process, optionally persisted to disk"""
+
+    def __init__(self, directory=None, max_age=24 * 3600):
+        self.directory = directory
+        self.max_age = max_age
+        self._memory = {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def get(self, url):
+        key = self._key(url)
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry or not self.directory:
+            return entry
+        meta_path = os.path.join(self.directory, f"{key}.json")
+        try:
+            if time.time() - os.path.getmtime(meta_path) > self.max_age:
+                return None
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(os.path.join(self.directory, f"{key}.body"), 'rb') as f:
+                entry = (meta['status'], meta['headers'], f.read())
+        except (OSError, ValueError, KeyError):
+            return None
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def put(self, url, status, headers, body):
+        key = self._key(url)
+        headers = {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS}
+        entry = (status, headers, body)
+        with self._lock:
+            self._memory[key] = entry
+        if self.directory:
+            with open(os.path.join(self.directory, f"{key}.body"), 'wb') as f:
+                f.write(body)
+            with open(os.path.join(self.directory, f"{key}.json"), 'w') as f:
+                json.dump({'url': url, 'status': status, 'headers': headers}, f)
+        return entry
+
+
+class RouteStats:
+    """Per-test request counters filled in by the route handler"""
+
+    def __init__(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.fetched = 0
+        self.blocked = 0
+        self.fetch_errors = 0  # fetches that failed and were handed back to the browser
+        self.bytes_fetched = 0
+        self.bytes_from_cache = 0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+
+def _host_matches(host, domains):
+    return any(host == d or host.endswith('.' + d) for d in domains)
+
+
+def should_block(request, block_mode, first_party_host):
+    """Analytics hosts are blocked in analytics and third-party modes; third-party also drops any other host's subresources"""
+    if block_mode == 'none':
+        return False
+    host = urlparse(request.url).hostname or ''
+    if _host_matches(host, ANALYTICS_HOSTS):
+        return True
+    # Never block navigations: OAuth buttons legitimately leave the site
+    return block_mode == 'third-party' and request.resource_type != 'document' and not _host_matches(host, (first_party_host,))
+
+
+def _cacheable(request):
+    return request.method == 'GET' and request.resource_type in STATIC_RESOURCE_TYPES
+
+
+def _continue(route):
+    try:
+        route.continue_()
+    except Exception:
+        pass  # the page or context is already gone, nothing is waiting on the request
+
+
+async def _continue_async(route):
+    try:
+        await route.continue_()
+    except Exception:
+        pass
+
+
+def install_routes(context, cache, stats, block_mode='none', first_party_host=''):
+    """Route every request of a context through the cache and block list"""
+    def handle(route, request):
+        stats.requests += 1
+        if should_block(request, block_mode, first_party_host):
+            stats.blocked += 1
+            return route.abort()
+        if cache is None or not _cacheable(request):
+            return route.continue_()
+        entry = cache.get(request.url)
+        if entry:
+            stats.cache_hits += 1
+            stats.bytes_from_cache += len(entry[2])
+            return route.fulfill(status=entry[0], headers=entry[1], body=entry[2])
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Exception:
+            # DNS errors, resets, a closed page: let the browser load (and fail) it as if never routed,
+            # since a request left unhandled would hang until the test times out
+            stats.fetch_errors += 1
+            return _continue(route)
+        stats.fetched += 1
+        stats.bytes_fetched += len(body)
+        if response.status == 200:
+            cache.put(request.url, response.status, response.headers, body)
+        route.fulfill(response=response, body=body)
+
+    context.route('**/*', handle)
+
+
+async def install_routes_async(context, cache, stats, block_mode='none', first_party_host=''):
+    """Async counterpart of install_routes"""
+    async def handle(route, request):
+        stats.requests += 1
+        if should_block(request, block_mode, first_party_host):
+            stats.blocked += 1
+            return await route.abort()
+        if cache is None or not _cacheable(request):
+            return await route.continue_()
+        entry = cache.get(request.url)
+        if entry:
+            stats.cache_hits += 1
+            stats.bytes_from_cache += len(entry[2])
+            return await route.fulfill(status=entry[0], headers=entry[1], body=entry[2])
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception:
+            stats.fetch_errors += 1
+            return await _continue_async(route)
+        stats.fetched += 1
+        stats.bytes_fetched += len(body)
+        if response.status == 200:
+            cache.put(request.url, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
+    await context.route('**/*', handle)
+
+
+_cache = None
+
+
+def get_asset_cache(mode):
+    """This process's shared cache for --asset-cache memory|disk, or None when off"""
+    global _cache
+    if mode == 'off':
+        return None
+    if _cache is None:
+        _cache = AssetCache(directory=ASSET_CACHE_DIR if mode == 'disk' else None)
+    return _cache
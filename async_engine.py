@@ -0,0 +1,261 @@
+import os
+import asyncio
+from playwright.async_api import async_playwright
+
+from browser_pool import DEFAULT_LAUNCH_ARGS
+from wait_strategies import WaitRecorder, plan_wait, async_snapshot_wait, async_wait_for, log_waits
+from screenshot_pipeline import ScreenshotOptions, STABILIZE_JS, element_clip
+from artifact_policy import CaptureSession, attempt_folder
+from auth_state import async_ensure_storage_state, session_expired, invalidate_session
+from asset_cache import install_routes_async, RouteStats
+from timings import PhaseTimer, format_phases
+from log_queue import get_test_logger
+from input_matrix import run_variants_async
+from batch_assertions import visibility_batches, check_visible_batch_async
+from retry_policy import RetryPolicy, run_with_retries_async
+from compiled_plan import compile_test_case, resolve_target, screenshot_name, assertion_error
+
+
+async def safe_screenshot(page, options=None, target=None):
+    options = options or ScreenshotOptions()
+    try:
+        if not page.is_closed():
+            await page.evaluate(STABILIZE_JS)
+            clip = None
+            if target is not None and options.clip == 'element' and await target.count() == 1:
+                clip = element_clip(await target.bounding_box(), page.viewport_size)
+            return await page.screenshot(animations='disabled', clip=clip, **options.screenshot_kwargs())
+    except Exception as e:
+        print(f"Screenshot failed: {str(e)}")
+
+
+ASSERTION_TIMEOUT = 3000
+
+
+async def check_assertion(page, step):
+    """Async counterpart of check_assertion in the sync runner"""
+    actual = None
+    try:
+        if step.kind == 'expect_url':
+            actual = page.url
+            await page.wait_for_url(lambda url: step.matcher.matches(url), timeout=ASSERTION_TIMEOUT)
+            return None
+        locator = resolve_target(page, step.target).first
+        if step.kind == 'expect_visible':
+            await locator.wait_for(state='visible', timeout=ASSERTION_TIMEOUT)
+            return None
+        if step.kind == 'expect_hidden':
+            await locator.wait_for(state='hidden', timeout=ASSERTION_TIMEOUT)
+            return None
+        if step.kind == 'expect_property':
+            actual = await locator.evaluate("(el, name) => el[name]", step.attribute)
+        else:
+            actual = await locator.get_attribute(step.attribute, timeout=ASSERTION_TIMEOUT)
+        if step.matcher.matches(actual):
+            return None
+    except Exception:
+        if step.kind == 'expect_url':
+            actual = page.url
+    return assertion_error(step, actual)
+
+
+async def execute_test_steps(page, test_case, capture, locators, waits=None, plan=None, timer=None):
+    """Async counterpart of execute_test_steps in the sync runner"""
+    plan = plan or test_case.get('plan') or compile_test_case(test_case)
+    waits = waits if waits is not None else WaitRecorder()
+    timer = timer or PhaseTimer(test_case['id'], path=None)
+    validation_errors = []
+    step_counter = 1
+    batches = visibility_batches(plan.steps)
+    batched = {start + n for start, steps in batches.items() for n in range(len(steps))}
+
+    for index, step in enumerate(plan.steps):
+        if step.kind == 'goto':
+            if index > 0:
+                with timer.phase('goto', url=step.value):
+                    await page.goto(step.value, timeout=5000)
+            continue
+
+        if index in batches:
+            with timer.phase('assertion', step=index, description=f"{len(batches[index])} visibility checks"):
+                validation_errors.extend(await check_visible_batch_async(page, batches[index], ASSERTION_TIMEOUT))
+            continue
+        if index in batched:
+            continue
+
+        if step.is_assertion:
+            with timer.phase('assertion', step=index, description=step.description):
+                error = await check_assertion(page, step)
+            if error:
+                validation_errors.append(error)
+            continue
+
+        start_url = page.url
+        locator = resolve_target(page, step.target)
+        wait = None
+        if step.wait_phase:
+            # Planned before the step, so its outcome is told apart from what the page showed already
+            wait = plan_wait(test_case, step.wait_phase, locators, start_url)
+            with timer.phase('wait', step=index, wait_phase=step.wait_phase, snapshot=True):
+                await async_snapshot_wait(page, wait)
+        with timer.phase('step', step=index, kind=step.kind, description=step.description):
+            if step.kind == 'fill':
+                await locator.fill(step.value)
+            else:
+                await locator.click()
+
+        if wait:
+            with timer.phase('wait', step=index, wait_phase=step.wait_phase):
+                await async_wait_for(page, wait, waits)
+        name = screenshot_name(step_counter, step, plan)
+        with timer.phase('screenshot', name=name):
+            await capture.screenshot_async(page, name, locator)
+        step_counter += 1
+
+    return validation_errors
+
+
+async def run_test(browser, test_case, prepared, build_context_options, auth_lock, timer=None):
+    """Run one test case in its own context on a shared browser"""
+    test_id = test_case['id']
+    logger = get_test_logger(test_id)
+    timer = timer or PhaseTimer(test_id)
+
+    capture = CaptureSession(prepared['policy'], prepared['screenshots_folder'], prepared['videos_folder'], safe_screenshot,
+                             trace_path=os.path.join(prepared['test_folder'], 'trace.zip'),
+                             options=prepared['screenshot_options'], writer=prepared['screenshot_writer'])
+    context_options = build_context_options(capture)
+    if prepared['auth_cache']:
+        with timer.phase('auth'):
+            context_options['storage_state'] = await async_ensure_storage_state(
+                browser, prepared['auth_cache'], prepared['login_url'], prepared['login_locators'], auth_lock)
+    with timer.phase('context'):
+        context = await browser.new_context(**context_options)
+    network = RouteStats()
+    if prepared['asset_cache'] or prepared['block_mode'] != 'none':
+        await install_routes_async(context, prepared['asset_cache'], network, prepared['block_mode'], prepared['first_party_host'])
+    await capture.start_tracing_async(context)
+    page = await context.new_page()
+    waits = WaitRecorder()
+    failed = False
+    try:
+        logger.info(f"Running test: {test_case['title']}")
+        logger.info(f"Module: {prepared['module_name']}, URL: {prepared['url']}")
+
+        with timer.phase('goto', url=prepared['url']):
+            await page.goto(prepared['url'], timeout=5000)
+            await page.wait_for_load_state('domcontentloaded', timeout=1500)
+        with timer.phase('screenshot', name='00_initial.png'):
+            await capture.screenshot_async(page, '00_initial.png')
+
+        if prepared['variants']:
+            validation_errors = await run_variants_async(
+                page, prepared['variants'], page.url,
+                lambda plan: execute_test_steps(page, test_case, capture, prepared['locators'], waits, plan, timer),
+                prepared['matrix_reset'], on_failure=lambda plan: capture.flush_frames())
+        else:
+            validation_errors = await execute_test_steps(page, test_case, capture, prepared['locators'], waits, prepared['plan'], timer)
+        if validation_errors:
+            raise Exception(f"Test validation failed: {'; '.join(validation_errors)}")
+
+        with timer.phase('screenshot', name='99_final.png'):
+            await capture.screenshot_async(page, '99_final.png')
+        logger.info(f"Test {test_id} completed successfully")
+
+    except Exception as e:
+        logger.error(f"Test {test_id} failed: {str(e)}")
+        failed = True
+        with timer.phase('screenshot', name='error.png'):
+            await capture.screenshot_async(page, 'error.png')
+        if prepared['auth_cache'] and session_expired(page, prepared['login_url']):
+            logger.warning("Session expired; cached login state invalidated")
+            invalidate_session(prepared['auth_cache'], prepared['login_url'])
+        raise
+    finally:
+        log_waits(logger, waits)
+        waits.save(os.path.join(prepared['test_folder'], 'waits.json'))
+        logger.info(f"Network: {network.requests} requests, {network.cache_hits} served from cache, {network.blocked} blocked, {network.bytes_fetched} bytes fetched")
+        network.save(os.path.join(prepared['test_folder'], 'network.json'))
+        # A teardown error must not replace the test's own error or skip flushing its artifacts
+        try:
+            with timer.phase('teardown'):
+                try:
+                    await capture.stop_tracing_async(context, failed)
+                finally:
+                    await context.close()
+        except Exception as e:
+            logger.error(f"Context close failed: {str(e)}")
+        capture.finish(failed)
+        logger.info(f"Timings: {format_phases(timer.totals)}")
+
+
+async def run_all(test_cases, prepare, build_result, build_context_options, concurrency=8, browsers=1, headless=False, on_result=None,
+                  retry_policy=None):
+    """Run test cases as concurrent tasks, at most `concurrency` contexts open at once"""
+    retry_policy = retry_policy or RetryPolicy()
+    semaphore = asyncio.Semaphore(concurrency)
+    auth_lock = asyncio.Lock()
+    total = len(test_cases)
+    done = 0
+
+    async with async_playwright() as p:
+        launched = [None] * max(1, browsers)
+        launch_locks = [asyncio.Lock() for _ in launched]
+
+        async def browser_for(slot, timer):
+            """The slot's browser, launched by the first test to need it and relaunched once it has disconnected"""
+            async with launch_locks[slot]:
+                browser = launched[slot]
+                if browser is None or not browser.is_connected():
+                    with timer.phase('launch'):
+                        browser = await p.chromium.launch(headless=headless, args=DEFAULT_LAUNCH_ARGS)
+                    launched[slot] = browser
+                return browser
+
+        async def run_one(index, test_case):
+            nonlocal done
+            slot = index % len(launched)
+
+            async def attempt(number):
+                # A timer per attempt, created inside the semaphore so queueing time is not counted as test time
+                timer = PhaseTimer(test_case['id'])
+                try:
+                    browser = await browser_for(slot, timer)
+                except Exception as e:
+                    result = build_result(test_case, 'FAILED', f"Browser launch failed: {e}", timer=timer)
+                    # A launch timeout is still the browser's fault, not the test's (see retry_policy.py)
+                    result['failure_category'] = 'infrastructure'
+                    return result
+                try:
+                    prepared = prepare(test_case)
+                    prepared['videos_folder'] = attempt_folder(prepared['videos_folder'], number)
+                    await run_test(browser, test_case, prepared, build_context_options, auth_lock, timer)
+                    return build_result(test_case, 'PASSED', timer=timer)
+                except Exception as e:
+                    return build_result(test_case, 'FAILED', str(e), timer=timer)
+
+            async with semaphore:
+                result = await run_with_retries_async(attempt, retry_policy)
+            if result['status'] == 'PASSED':
+                outcome = "✅ PASSED (flaky)" if result.get('flaky') else "✅ PASSED"
+            else:
+                outcome = f"❌ FAILED: {result['error']}"
+            done += 1
+            print(f"[{done}/{total}] {test_case['id']}: {test_case['title']} - {outcome}")
+            if on_result:
+                on_result(result)
+            return result
+
+        try:
+            return await asyncio.gather(*[run_one(i, tc) for i, tc in enumerate(test_cases)])
+        finally:
+            for browser in launched:
+                if browser and browser.is_connected():
+                    await browser.close()
+
+
+def run_tests_async(test_cases, prepare, build_result, build_context_options, concurrency=8, browsers=1, headless=False, on_result=None,
+                    retry_policy=None):
+    """Blocking entry point used by the runner's --engine async mode"""
+    return list(asyncio.run(run_all(test_cases, prepare, build_result, build_context_options, concurrency, browsers, headless, on_result,
+                                    retry_policy)))
@@ -0,0 +1,137 @@
+import os
+import time
+import hashlib
+from urllib.parse import urlparse
+
+AUTH_STATE_DIR = '.auth_state'
+DEFAULT_TTL = 30 * 60  # seconds a saved session is trusted
+
+
+def base_url_of(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class StorageStateCache:
+    """Saved context.storage_state() files keyed by user and base URL, trusted for ttl seconds"""
+
+    def __init__(self, directory=AUTH_STATE_DIR, ttl=DEFAULT_TTL):
+        self.directory = directory
+        self.ttl = ttl
+
+    def path_for(self, user, base_url):
+        key = hashlib.sha256(f"{user}|{base_url}".encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, user, base_url):
+        """Return the state file path if a fresh one exists, else None"""
+        path = self.path_for(user, base_url)
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return None
+        if age > self.ttl:
+            self.invalidate(user, base_url)
+            return None
+        return path
+
+    def save(self, context, user, base_url):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(user, base_url)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        context.storage_state(path=tmp_path)
+        # Atomic so a parallel worker never reads a half-written file
+        os.replace(tmp_path, path)
+        return path
+
+    def invalidate(self, user, base_url):
+        try:
+            os.remove(self.path_for(user, base_url))
+        except OSError:
+            pass
+
+
+def get_credentials():
+    """Credentials for authenticated tests, from the environment (or a .env file if python-dotenv is installed)"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+    return os.environ.get('TEST_USER_EMAIL'), os.environ.get('TEST_USER_PASSWORD')
+
+
+def requires_auth(test_case):
+    """Tests opt in with "requiresAuth": true; dashboard tests always start logged in"""
+    return bool(test_case.get('requiresAuth')) or 'dashboard' in test_case.get('module', '').lower()
+
+
+def login_and_save(pool, cache, user, password, login_url, locators, timeout=10000):
+    """Run the login flow once in a throwaway context and save its storage state"""
+    context = pool.new_context(ignore_https_errors=True)
+    try:
+        page = context.new_page()
+        page.goto(login_url, timeout=timeout)
+        page.locator(locators.email_input).fill(user)
+        page.locator(locators.password_input).fill(password)
+        page.locator(locators.submit_button).click()
+        page.wait_for_url(lambda url: '/dashboard' in url, timeout=timeout)
+        return cache.save(context, user, base_url_of(login_url))
+    finally:
+        context.close()
+
+
+async def async_login_and_save(browser, cache, user, password, login_url, locators, timeout=10000):
+    """Async counterpart of login_and_save for the async engine"""
+    context = await browser.new_context(ignore_https_errors=True)
+    try:
+        page = await context.new_page()
+        await page.goto(login_url, timeout=timeout)
+        await page.locator(locators.email_input).fill(user)
+        await page.locator(locators.password_input).fill(password)
+        await page.locator(locators.submit_button).click()
+        await page.wait_for_url(lambda url: '/dashboard' in url, timeout=timeout)
+        os.makedirs(cache.directory, exist_ok=True)
+        path = cache.path_for(user, base_url_of(login_url))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        await context.storage_state(path=tmp_path)
+        os.replace(tmp_path, path)
+        return path
+    finally:
+        await context.close()
+
+
+def ensure_storage_state(pool, cache, login_url, locators):
+    """Return a storage state path for the configured user, logging in only if no fresh state is cached"""
+    user, password = get_credentials()
+    if not user or not password:
+        raise Exception("Test requires an authenticated session but TEST_USER_EMAIL / TEST_USER_PASSWORD are not set")
+    path = cache.get(user, base_url_of(login_url))
+    if path:
+        return path
+    print(f"🔑 Logging in as {user} to cache the session")
+    return login_and_save(pool, cache, user, password, login_url, locators)
+
+
+async def async_ensure_storage_state(browser, cache, login_url, locators, lock):
+    """Async counterpart of ensure_storage_state; lock stops concurrent tasks logging in at once"""
+    user, password = get_credentials()
+    if not user or not password:
+        raise Exception("Test requires an authenticated session but TEST_USER_EMAIL / TEST_USER_PASSWORD are not set")
+    async with lock:
+        path = cache.get(user, base_url_of(login_url))
+        if path:
+            return path
+        print(f"🔑 Logging in as {user} to cache the session")
+        return await async_login_and_save(browser, cache, user, password, login_url, locators)
+
+
+def session_expired(page, login_url):
+    """A test that expected to be logged in but was bounced back to the login page"""
+    return urlparse(page.url).path.rstrip('/') == urlparse(login_url).path.rstrip('/')
+
+
+def invalidate_session(cache, login_url):
+    user, _ = get_credentials()
+    if user:
+        cache.invalidate(user, base_url_of(login_url))
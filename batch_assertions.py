@@ -0,0 +1,124 @@
+import time
+
+from locator_check import translate
+from compiled_plan import resolve_target, assertion_error
+
+POLL_MS = 50
+
+# Engines the in-page check below implements the way Playwright does (attribute or CSS matching), so its
+# answers are trusted as they are. Role, label and text matching (accessible names, ARIA rules) can only be
+# approximated in a page script, so those steps are always left to Playwright's own wait.
+IN_PAGE_ENGINES = ('css', 'placeholder', 'alt_text')
+
+# Finds every entry's element the way the matching page.getBy* call or locator would and polls until all
+# of them are visible or the timeout runs out, all in one evaluation.
+WAIT_VISIBLE_JS = """async ({entries, timeout, pollMs}) => {
+    const norm = s => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const visible = el => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const find = ({by, value, text}) => {
+        const needle = norm(by === 'css' ? text : value);
+        if (by === 'placeholder') return Array.from(document.querySelectorAll('[placeholder]'))
+            .filter(el => norm(el.getAttribute('placeholder')).includes(needle));
+        if (by === 'alt_text') return Array.from(document.querySelectorAll('[alt]'))
+            .filter(el => norm(el.getAttribute('alt')).includes(needle));
+        const matches = Array.from(document.querySelectorAll(value));
+        return text === null ? matches : matches.filter(el => norm(el.textContent).includes(needle));
+    };
+    const check = () => entries.map(entry => {
+        let matches = [];
+        try { matches = find(entry); } catch (e) {}
+        return {index: entry.index, count: matches.length, visible: matches.length > 0 && visible(matches[0])};
+    });
+    const deadline = performance.now() + timeout;
+    let results = check();
+    while (results.some(result => !result.visible) && performance.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, pollMs));
+        results = check();
+    }
+    return results;
+}"""
+
+
+def visibility_batches(steps):
+    """{index of the first step: [steps]} for each run of two or more consecutive expect_visible steps"""
+    batches = {}
+    start = None
+    for index, step in enumerate(list(steps) + [None]):
+        if step is not None and step.kind == 'expect_visible':
+            if start is None:
+                start = index
+            continue
+        if start is not None and index - start > 1:
+            batches[start] = steps[start:index]
+        start = None
+    return batches
+
+
+def _entry(index, target):
+    """The WAIT_VISIBLE_JS entry for a Target, or None if only Playwright can resolve it"""
+    if target.by not in IN_PAGE_ENGINES:
+        return None
+    if target.by != 'css':
+        return {'index': index, 'by': target.by, 'value': target.value, 'text': None}
+    translated = translate(target.value)
+    if translated is None:
+        return None
+    return {'index': index, 'by': 'css', 'value': translated[0], 'text': translated[1]}
+
+
+def _split(steps):
+    entries, playwright_only = [], []
+    for index, step in enumerate(steps):
+        entry = _entry(index, step.target)
+        if entry is None:
+            playwright_only.append(index)
+        else:
+            entries.append(entry)
+    return entries, playwright_only
+
+
+def _remaining_ms(deadline):
+    # Never 0, which Playwright reads as "no timeout"
+    return max(1, int((deadline - time.perf_counter()) * 1000))
+
+
+def check_visible_batch(page, steps, timeout=3000):
+    """Check expect_visible steps together against one shared deadline; returns an error for every missing element"""
+    deadline = time.perf_counter() + timeout / 1000
+    entries, playwright_only = _split(steps)
+    missing = []
+    try:
+        if entries:
+            results = page.evaluate(WAIT_VISIBLE_JS, {'entries': entries, 'timeout': _remaining_ms(deadline), 'pollMs': POLL_MS})
+            missing = [r['index'] for r in results if not r['visible']]
+    except Exception:
+        # e.g. the page navigated during the evaluation: let Playwright check every step instead
+        missing, playwright_only = [], list(range(len(steps)))
+    for index in playwright_only:
+        try:
+            resolve_target(page, steps[index].target).first.wait_for(state='visible', timeout=_remaining_ms(deadline))
+        except Exception:
+            missing.append(index)
+    return [assertion_error(steps[index], None) for index in sorted(missing)]
+
+
+async def check_visible_batch_async(page, steps, timeout=3000):
+    """Async counterpart of check_visible_batch"""
+    deadline = time.perf_counter() + timeout / 1000
+    entries, playwright_only = _split(steps)
+    missing = []
+    try:
+        if entries:
+            results = await page.evaluate(WAIT_VISIBLE_JS, {'entries': entries, 'timeout': _remaining_ms(deadline), 'pollMs': POLL_MS})
+            missing = [r['index'] for r in results if not r['visible']]
+    except Exception:
+        missing, playwright_only = [], list(range(len(steps)))
+    for index in playwright_only:
+        try:
+            await resolve_target(page, steps[index].target).first.wait_for(state='visible', timeout=_remaining_ms(deadline))
+        except Exception:
+            missing.append(index)
+    return [assertion_error(steps[index], None) for index in sorted(missing)]
@@ -0,0 +1,244 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from contextlib import contextmanager, redirect_stdout
+
+# Benchmarks for the runner's own overhead, measured against the bundled stand-in app
+#
+#   python benchmark_runner.py                  # run, compare with .benchmarks/baseline.json
+#   python benchmark_runner.py --save-baseline  # run and make this the new baseline
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import test_universal_autogenerated as runner
+from browser_pool import DEFAULT_LAUNCH_ARGS
+from local_server import LocalAppServer
+from compiled_plan import PLAN_CACHE_DIR
+
+BENCH_DIR = '.benchmarks'
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_THRESHOLD = 0.20  # a median this much slower than baseline is a regression
+REPORT_SIZES = (10, 1000, 10000)
+TESTCASE_FILES = ('login_testcases.json', 'signup_testcases.json')
+
+
+def measure(func, repeat):
+    """Run func repeat times; returns median/min/max in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        'median_ms': round(statistics.median(samples), 2),
+        'min_ms': round(min(samples), 2),
+        'max_ms': round(max(samples), 2),
+        'runs': repeat,
+    }
+
+
+@contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def synthetic_results(count):
+    """Report rows shaped like real results: mostly passes, some failures with errors"""
+    results = []
+    for i in range(count):
+        module = ('Login', 'Sign Up', 'Dashboard')[i % 3]
+        result = {'id': f"TC-BENCH-{i:05d}", 'title': f"Synthetic {module.lower()} case {i}", 'module': module,
+                  'status': 'FAILED' if i % 7 == 0 else 'PASSED',
+                  'timings': {'duration_ms': 1500.0 + i % 500, 'phases': {'context': 40.0, 'goto': 600.0, 'step': 500.0, 'screenshot': 300.0}}}
+        if result['status'] == 'FAILED':
+            result['error'] = "Test validation failed: button 'Login' not visible"
+        results.append(result)
+    return results
+
+
+def bench_load_testcases(source_dir, repeat):
+    """load_all_testcases with a cold plan cache (compiles every step) and a warm one"""
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='bench-load-')
+    try:
+        os.makedirs(os.path.join(workdir, 'testcases'))
+        for name in TESTCASE_FILES:
+            shutil.copy(os.path.join(source_dir, name), os.path.join(workdir, 'testcases', name))
+        # load_all_testcases prints a line per file; keep it out of the benchmark output
+        with working_directory(workdir), open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            def cold():
+                shutil.rmtree(PLAN_CACHE_DIR, ignore_errors=True)
+                runner.load_all_testcases()
+            results['load_testcases_cold'] = measure(cold, repeat)
+            results['load_testcases_warm'] = measure(runner.load_all_testcases, repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def bench_report(sizes, repeat):
+    """generate_html_report for synthetic result sets of each size"""
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='bench-report-')
+    try:
+        with working_directory(workdir):
+            os.makedirs('artifacts')
+            for size in sizes:
+                rows = synthetic_results(size)
+                results[f"report_{size}"] = measure(lambda: runner.generate_html_report(rows), repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def bench_browser(repeat, headless=True):
+    """Launch vs context reuse, safe_screenshot, and video recording on vs off against the stand-in app"""
+    from playwright.sync_api import sync_playwright
+
+    results = {}
+    server = LocalAppServer().start()
+    login_url = f"{server.base_url}/login"
+    video_dir = tempfile.mkdtemp(prefix='bench-video-')
+    try:
+        with sync_playwright() as p:
+            def launch_per_test():
+                browser = p.chromium.launch(headless=headless, args=DEFAULT_LAUNCH_ARGS)
+                context = browser.new_context()
+                context.new_page().goto(login_url)
+                context.close()
+                browser.close()
+            results['launch_per_test'] = measure(launch_per_test, repeat)
+
+            browser = p.chromium.launch(headless=headless, args=DEFAULT_LAUNCH_ARGS)
+            try:
+                def reuse_browser():
+                    context = browser.new_context()
+                    context.new_page().goto(login_url)
+                    context.close()
+                results['context_reuse'] = measure(reuse_browser, repeat)
+
+                context = browser.new_context()
+                page = context.new_page()
+                page.goto(login_url)
+                results['safe_screenshot'] = measure(lambda: runner.safe_screenshot(page), repeat)
+                context.close()
+
+                def login_flow(**options):
+                    context = browser.new_context(**options)
+                    page = context.new_page()
+                    page.goto(login_url)
+                    page.locator('#login-email').fill('demo@example.com')
+                    page.locator('#login-password').fill('Demo@12345')
+                    page.get_by_role('button', name='Login').click()
+                    page.wait_for_url('**/dashboard')
+                    # Closing finalizes the video, which is where most of its cost lands
+                    context.close()
+                results['video_off'] = measure(login_flow, repeat)
+                results['video_on'] = measure(lambda: login_flow(record_video_dir=video_dir,
+                                                                  record_video_size={"width": 1280, "height": 720}), repeat)
+            finally:
+                browser.close()
+    finally:
+        server.stop()
+        shutil.rmtree(video_dir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print each benchmark against the baseline; returns the names that regressed"""
+    regressions = []
+    print(f"\n{'Benchmark':<24}{'Median':>12}{'Baseline':>12}{'Change':>10}")
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name) if baseline else None
+        if not base:
+            print(f"{name:<24}{result['median_ms']:>10.1f}ms{'-':>12}{'new':>10}")
+            continue
+        change = (result['median_ms'] - base['median_ms']) / base['median_ms'] if base['median_ms'] else 0.0
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  ❌ REGRESSION'
+        elif change < -threshold:
+            flag = '  ✅ faster'
+        print(f"{name:<24}{result['median_ms']:>10.1f}ms{base['median_ms']:>10.1f}ms{change:>+9.0%}{flag}")
+    return regressions
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the test runner's own overhead")
+    parser.add_argument('--repeat', help='Runs per benchmark (the median is compared)', type=int, default=5)
+    parser.add_argument('--sizes', help='Comma-separated result counts for report generation', default=','.join(map(str, REPORT_SIZES)))
+    parser.add_argument('--skip-browser', help='Only run the benchmarks that need no browser', action='store_true')
+    parser.add_argument('--headed', help='Show the browser (numbers are not comparable with headless runs)', action='store_true')
+    parser.add_argument('--baseline', help='Baseline file to compare against', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', help='Store this run as the baseline', action='store_true')
+    parser.add_argument('--threshold', help='Fractional slowdown of a median that counts as a regression', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+
+    print(f"⏱️  Benchmarking runner overhead ({args.repeat} runs each)")
+    results = {}
+    results.update(bench_load_testcases(source_dir, args.repeat))
+    results.update(bench_report(sizes, args.repeat))
+    if not args.skip_browser:
+        results.update(bench_browser(args.repeat, headless=not args.headed))
+
+    run = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'repeat': args.repeat,
+        'headless': not args.headed,
+        'results': results,
+    }
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    output_file = os.path.join(BENCH_DIR, f"{run['commit']}-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_file, 'w') as f:
+        json.dump(run, f, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        print(f"📏 Comparing with baseline from commit {baseline.get('commit')} ({baseline.get('timestamp')})")
+        if baseline.get('headless') != run['headless']:
+            print("⚠️  Baseline was recorded in a different headless mode; numbers are not comparable")
+    regressions = compare(results, baseline, args.threshold)
+
+    print(f"\n💾 Results: {output_file}")
+    if args.save_baseline:
+        shutil.copy(output_file, args.baseline)
+        print(f"📌 Saved as baseline: {args.baseline}")
+        return 0
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    if baseline:
+        print("✅ No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
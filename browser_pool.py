@@ -0,0 +1,126 @@
+import time
+from playwright.sync_api import sync_playwright
+
+DEFAULT_LAUNCH_ARGS = ['--disable-web-security', '--disable-features=VizDisplayCompositor', '--no-sandbox', '--disable-dev-shm-usage']
+
+
+class BrowserPool:
+    """Keeps one Chromium alive per worker and hands out a fresh BrowserContext per test"""
+
+    def __init__(self, headless=False, recycle_after=0, launch_args=None):
+        self.headless = headless
+        self.recycle_after = recycle_after
+        self.launch_args = launch_args or DEFAULT_LAUNCH_ARGS
+        self._playwright = None
+        self._browser = None
+        self._contexts_served = 0
+        self._needs_restart = False
+        self.launch_times = []
+        self.context_times = []
+
+    def start(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        if self._browser is None:
+            self._launch()
+        return self
+
+    def _launch(self):
+        started = time.perf_counter()
+        self._browser = self._playwright.chromium.launch(headless=self.headless, args=self.launch_args)
+        self.launch_times.append(time.perf_counter() - started)
+        self._contexts_served = 0
+        self._needs_restart = False
+
+    def _restart(self):
+        try:
+            if self._browser is not None:
+                self._browser.close()
+        except Exception as e:
+            print(f"Browser close failed during recycle: {e}")
+        self._browser = None
+        self._launch()
+
+    def new_context(self, **context_options):
+        """Return a new isolated context, restarting the browser if it crashed or hit the recycle limit"""
+        self.start()
+        recycle_due = self.recycle_after and self._contexts_served >= self.recycle_after
+        if self._needs_restart or recycle_due or not self._browser.is_connected():
+            self._restart()
+        started = time.perf_counter()
+        context = self._browser.new_context(**context_options)
+        self.context_times.append(time.perf_counter() - started)
+        self._contexts_served += 1
+        return context
+
+    def mark_crashed(self):
+        """Force a browser restart before the next context is handed out"""
+        self._needs_restart = True
+
+    def is_healthy(self):
+        return self._browser is not None and self._browser.is_connected()
+
+    def stats(self):
+        return {
+            'launches': len(self.launch_times),
+            'launch_total': sum(self.launch_times),
+            'contexts': len(self.context_times),
+            'context_total': sum(self.context_times),
+            'context_avg': (sum(self.context_times) / len(self.context_times)) if self.context_times else 0.0,
+        }
+
+    def close(self):
+        try:
+            if self._browser is not None:
+                self._browser.close()
+        except Exception as e:
+            print(f"Browser close failed: {e}")
+        finally:
+            self._browser = None
+            if self._playwright is not None:
+                self._playwright.stop()
+                self._playwright = None
+
+
+_pool = None
+
+
+def get_browser_pool(headless=False, recycle_after=0):
+    """Return this process's browser pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool(headless=headless, recycle_after=recycle_after)
+    return _pool
+
+
+def close_browser_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+def merge_pool_stats(results):
+    """Combine the cumulative pool stats each worker attached to its results"""
+    latest = {}
+    for result in results:
+        stats = result.pop('pool_stats', None)
+        worker = result.get('worker')
+        if stats and (worker not in latest or stats['contexts'] > latest[worker]['contexts']):
+            latest[worker] = stats
+    launch_total = sum(s['launch_total'] for s in latest.values())
+    context_total = sum(s['context_total'] for s in latest.values())
+    contexts = sum(s['contexts'] for s in latest.values())
+    return {
+        'launches': sum(s['launches'] for s in latest.values()),
+        'launch_total': launch_total,
+        'contexts': contexts,
+        'context_total': context_total,
+        'context_avg': (context_total / contexts) if contexts else 0.0,
+    }
+
+
+def print_pool_stats(stats):
+    print(f"\n🧭 Browser Pool:")
+    print(f"   Launches: {stats['launches']} ({stats['launch_total']:.2f}s)")
+    print(f"   Contexts: {stats['contexts']} ({stats['context_total']:.2f}s, avg {stats['context_avg']*1000:.0f}ms)")
@@ -0,0 +1,349 @@
+import os
+import re
+import json
+import hashlib
+from dataclasses import dataclass, field, asdict, replace
+
+import input_matrix
+from input_matrix import expand_variants
+
+# Bump when the compiled format changes; edits to the parse rules are picked up from the source hash below
+COMPILER_VERSION = 2
+PLAN_CACHE_DIR = '.plan_cache'
+
+JS_STRING = r"'((?:[^'\\]|\\.)*)'"
+JS_REGEX = r"/((?:[^/\\]|\\.)+)/"
+
+
+class PlanError(Exception):
+    """A test step uses syntax the compiler does not support"""
+
+
+@dataclass
+class Target:
+    """A locator: by is role, alt_text, text, label, placeholder or css"""
+    by: str
+    value: str
+    name: str = None
+
+    def describe(self):
+        if self.by == 'role':
+            return f"{self.value} '{self.name}'" if self.name else self.value
+        return f"{self.by} '{self.value}'"
+
+
+@dataclass
+class Matcher:
+    """An expected value: exact string, substring (expect.stringContaining) or regex"""
+    kind: str
+    value: str
+
+    def matches(self, actual):
+        actual = '' if actual is None else str(actual)
+        if self.kind == 'contains':
+            return self.value in actual
+        if self.kind == 'regex':
+            return re.search(self.value, actual) is not None
+        return actual == self.value
+
+    def describe(self):
+        if self.kind == 'contains':
+            return f"containing '{self.value}'"
+        if self.kind == 'regex':
+            return f"matching /{self.value}/"
+        return f"equal to '{self.value}'"
+
+
+@dataclass
+class Step:
+    """One executable step; kind is goto, fill, click, expect_visible, expect_hidden, expect_url, expect_property or expect_attribute"""
+    kind: str
+    description: str
+    target: Target = None
+    value: str = None
+    matcher: Matcher = None
+    attribute: str = None
+    wait_phase: str = None
+
+    @property
+    def is_assertion(self):
+        return self.kind.startswith('expect_')
+
+
+@dataclass
+class TestPlan:
+    test_id: str
+    steps: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    variant: str = None  # label of the inputMatrix combination this plan was compiled for
+
+
+def _unescape(value):
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+BY_METHOD = {
+    'getByAltText': 'alt_text',
+    'getByText': 'text',
+    'getByLabelText': 'label',
+    'getByLabel': 'label',
+    'getByPlaceholderText': 'placeholder',
+    'getByPlaceholder': 'placeholder',
+}
+
+
+def parse_target(expr):
+    """Parse a locator expression such as getByRole('button', { name: 'Login' })"""
+    expr = expr.strip()
+    match = re.fullmatch(r"(?:page\.)?getByRole\(" + JS_STRING + r"(?:\s*,\s*\{\s*name:\s*" + JS_STRING + r"\s*\})?\)", expr)
+    if match:
+        name = _unescape(match.group(2)) if match.group(2) is not None else None
+        return Target('role', _unescape(match.group(1)), name)
+    match = re.fullmatch(r"(?:page\.)?(getBy\w+)\(" + JS_STRING + r"\)", expr)
+    if match and match.group(1) in BY_METHOD:
+        return Target(BY_METHOD[match.group(1)], _unescape(match.group(2)))
+    raise PlanError(f"unsupported locator expression: {expr}")
+
+
+def _input(inputs, name):
+    if name not in inputs:
+        raise PlanError(f"inputs.{name} is not defined")
+    return inputs[name]
+
+
+def _resolve_locator(ref, inputs):
+    """page.locator(inputs.x) -> the locator expression stored in inputs; page.getByX(...) -> itself"""
+    match = re.fullmatch(r"page\.locator\(inputs\.(\w+)\)", ref.strip())
+    if match:
+        return parse_target(_input(inputs, match.group(1)))
+    match = re.fullmatch(r"page\.locator\(" + JS_STRING + r"\)", ref.strip())
+    if match:
+        return Target('css', _unescape(match.group(1)))
+    match = re.fullmatch(r"page\.(getBy\w+)\(inputs\.(\w+)\)", ref.strip())
+    if match and match.group(1) in BY_METHOD:
+        return Target(BY_METHOD[match.group(1)], str(_input(inputs, match.group(2))))
+    return parse_target(ref)
+
+
+def _resolve_value(expr, inputs):
+    expr = expr.strip()
+    match = re.fullmatch(r"inputs\.(\w+)", expr)
+    if match:
+        return Matcher('exact', str(_input(inputs, match.group(1))))
+    match = re.fullmatch(JS_STRING, expr)
+    if match:
+        return Matcher('exact', _unescape(match.group(1)))
+    match = re.fullmatch(r"expect\.stringContaining\(" + JS_STRING + r"\)", expr)
+    if match:
+        return Matcher('contains', _unescape(match.group(1)))
+    match = re.fullmatch(JS_REGEX, expr)
+    if match:
+        return Matcher('regex', match.group(1).replace('\\/', '/'))
+    raise PlanError(f"unsupported value expression: {expr}")
+
+
+def _click_wait_phase(target):
+    """Which wait strategy applies after clicking this target (see wait_strategies.plan_wait)"""
+    label = (target.name or target.value or '').lower()
+    if 'google' in label or 'facebook' in label:
+        return 'after_social'
+    if target.by == 'role' and target.value == 'link' and label == 'forgot password':
+        return 'after_forgot_password'
+    if target.by == 'role' and target.value == 'button' and label in ('login', 'sign up'):
+        return 'after_submit'
+    return None
+
+
+def parse_step(step, inputs):
+    """Compile one JSON step string into a Step"""
+    if 'await ' not in step:
+        raise PlanError(f"no executable code in step: {step}")
+    description, _, _ = step.partition('await ')
+    description = description.strip().rstrip(':').strip() or step.strip()
+    code = step[step.index('await ') + len('await '):].strip().rstrip(';')
+
+    match = re.fullmatch(r"page\.goto\(inputs\.(\w+)\)", code)
+    if match:
+        return Step('goto', description, value=str(_input(inputs, match.group(1))))
+
+    match = re.fullmatch(r"(page\..+)\.fill\((.+)\)", code)
+    if match:
+        return Step('fill', description, target=_resolve_locator(match.group(1), inputs),
+                    value=_resolve_value(match.group(2), inputs).value)
+
+    match = re.fullmatch(r"(page\..+)\.click\(\)", code)
+    if match:
+        target = _resolve_locator(match.group(1), inputs)
+        return Step('click', description, target=target, wait_phase=_click_wait_phase(target))
+
+    match = re.fullmatch(r"page\.waitForURL\((.+)\)", code)
+    if match:
+        return Step('expect_url', description, matcher=_resolve_value(match.group(1), inputs))
+
+    match = re.fullmatch(r"expect\(page\)\.toHaveURL\((.+)\)", code)
+    if match:
+        return Step('expect_url', description, matcher=_resolve_value(match.group(1), inputs))
+
+    match = re.fullmatch(r"expect\((page\..+)\)\.(not\.)?toBeVisible\(\)", code)
+    if match:
+        kind = 'expect_hidden' if match.group(2) else 'expect_visible'
+        return Step(kind, description, target=_resolve_locator(match.group(1), inputs))
+
+    match = re.fullmatch(r"expect\((page\..+)\)\.toHaveJSProperty\(" + JS_STRING + r"\s*,\s*(.+)\)", code)
+    if match:
+        return Step('expect_property', description, target=_resolve_locator(match.group(1), inputs),
+                    attribute=_unescape(match.group(2)), matcher=_resolve_value(match.group(3), inputs))
+
+    match = re.fullmatch(r"expect\((page\..+)\)\.toHaveAttribute\(" + JS_STRING + r"\s*,\s*(.+)\)", code)
+    if match:
+        return Step('expect_attribute', description, target=_resolve_locator(match.group(1), inputs),
+                    attribute=_unescape(match.group(2)), matcher=_resolve_value(match.group(3), inputs))
+
+    raise PlanError(f"unsupported step syntax: {code}")
+
+
+def compile_test_case(test_case):
+    """Compile every step of a test case; unsupported steps are collected as plan errors"""
+    plan = TestPlan(test_case['id'])
+    inputs = test_case.get('inputs', {})
+    for step in test_case.get('steps', []):
+        try:
+            plan.steps.append(parse_step(step, inputs))
+        except PlanError as e:
+            plan.errors.append(f"{e} (step: {step})")
+    return plan
+
+
+def compile_variants(test_case):
+    """One plan per inputMatrix combination, with ids TC-ID#1, TC-ID#2, ..."""
+    try:
+        variants = expand_variants(test_case)
+    except ValueError as e:
+        raise PlanError(str(e))
+    plans = []
+    for n, (label, inputs) in enumerate(variants, 1):
+        plan = compile_test_case(dict(test_case, id=f"{test_case['id']}#{n}", inputs=inputs))
+        plan.variant = label
+        plans.append(plan)
+    return plans
+
+
+def variant_plans(plans, test_id):
+    """The variant plans compiled for test_id, in matrix order"""
+    found = []
+    while f"{test_id}#{len(found) + 1}" in plans:
+        found.append(plans[f"{test_id}#{len(found) + 1}"])
+    return found
+
+
+def _plan_from_dict(data):
+    steps = []
+    for s in data['steps']:
+        s = dict(s)
+        if s.get('target'):
+            s['target'] = Target(**s['target'])
+        if s.get('matcher'):
+            s['matcher'] = Matcher(**s['matcher'])
+        steps.append(Step(**s))
+    return TestPlan(data['test_id'], steps, data['errors'], data.get('variant'))
+
+
+_compiler_digest = None
+
+
+def compiler_digest():
+    """COMPILER_VERSION plus the source of this module and input_matrix.py, which plans are built from"""
+    global _compiler_digest
+    if _compiler_digest is None:
+        digest = hashlib.sha256(str(COMPILER_VERSION).encode())
+        for module_file in (__file__, input_matrix.__file__):
+            with open(module_file, 'rb') as f:
+                digest.update(f.read())
+        _compiler_digest = digest.hexdigest()
+    return _compiler_digest
+
+
+def load_or_compile_plans(filepath, data):
+    """Return {test_id: TestPlan} for a testcases file, reusing the on-disk plan if neither it nor the compiler changed"""
+    with open(filepath, 'rb') as f:
+        digest = hashlib.sha256(f.read() + compiler_digest().encode()).hexdigest()[:16]
+    cache_file = os.path.join(PLAN_CACHE_DIR, f"{os.path.splitext(os.path.basename(filepath))[0]}-{digest}.json")
+
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r') as f:
+                return {p['test_id']: _plan_from_dict(p) for p in json.load(f)}
+        except Exception as e:
+            print(f"Ignoring unreadable plan cache {cache_file}: {e}")
+
+    plans = {}
+    for tc in data.get('testCases', []):
+        plans[tc['id']] = compile_test_case(tc)
+        try:
+            for plan in compile_variants(tc):
+                plans[plan.test_id] = plan
+        except PlanError as e:
+            plans[tc['id']].errors.append(str(e))
+    os.makedirs(PLAN_CACHE_DIR, exist_ok=True)
+    with open(cache_file, 'w') as f:
+        json.dump([asdict(p) for p in plans.values()], f)
+    return plans
+
+
+def report_plan_errors(plans):
+    """Print unsupported steps at build time; returns the number of broken plans"""
+    broken = [p for p in plans if p.errors]
+    for plan in broken:
+        print(f"⚠️  {plan.test_id}: {len(plan.errors)} unsupported step(s)")
+        for error in plan.errors:
+            print(f"     - {error}")
+    return len(broken)
+
+
+def resolve_target(page, target):
+    """Build a Playwright locator for a Target (works for both sync and async pages)"""
+    if target.by == 'role':
+        if target.name:
+            return page.get_by_role(target.value, name=target.name)
+        return page.get_by_role(target.value)
+    if target.by == 'alt_text':
+        return page.get_by_alt_text(target.value)
+    if target.by == 'text':
+        return page.get_by_text(target.value)
+    if target.by == 'label':
+        return page.get_by_label(target.value)
+    if target.by == 'placeholder':
+        return page.get_by_placeholder(target.value)
+    return page.locator(target.value)
+
+
+def screenshot_name(number, step, plan=None):
+    slug = re.sub(r'[^a-z0-9]+', '_', (step.target.name or step.target.value).lower()).strip('_')[:40]
+    suffix = 'filled' if step.kind == 'fill' else 'clicked'
+    name = f'step_{number:02d}_{slug}_{suffix}.png'
+    if plan is not None and plan.variant is not None:
+        # Variants share one page and capture, so each one's frames get its number (TC-1#2 -> v2_step_...)
+        return f"v{plan.test_id.rsplit('#', 1)[-1]}_{name}"
+    return name
+
+
+def assertion_error(step, actual):
+    if step.kind == 'expect_visible':
+        return f"{step.target.describe()} not visible"
+    if step.kind == 'expect_hidden':
+        return f"{step.target.describe()} still visible"
+    if step.kind == 'expect_url':
+        return f"Expected URL {step.matcher.describe()}, but URL is: {actual}"
+    return f"Expected {step.attribute} of {step.target.describe()} {step.matcher.describe()}, got '{actual}'"
+
+
+def retarget_plan(plan, rewrite_url):
+    """Copy of plan with goto URLs and exact URL expectations passed through rewrite_url"""
+    steps = []
+    for step in plan.steps:
+        if step.kind == 'goto':
+            step = replace(step, value=rewrite_url(step.value))
+        elif step.kind == 'expect_url' and step.matcher.kind == 'exact':
+            step = replace(step, matcher=Matcher('exact', rewrite_url(step.matcher.value)))
+        steps.append(step)
+    return TestPlan(plan.test_id, steps, list(plan.errors), plan.variant)
@@ -0,0 +1,71 @@
+import os
+import json
+import time
+import hashlib
+
+from sharding import HISTORY_DIR
+
+FINGERPRINTS_FILE = os.path.join(HISTORY_DIR, 'fingerprints.json')
+DEFAULT_FULL_RUN_HOURS = 24  # --changed-only still runs everything when the last full run is older than this
+
+
+def locator_source(locators):
+    """The selectors and aliases a test resolves against (comments and formatting in the file don't count)"""
+    return json.dumps({'selectors': locators.selectors, 'aliases': locators.aliases}, sort_keys=True).encode()
+
+
+def fingerprint(test_case, locators, url):
+    """Hash of everything a test's outcome depends on outside the runner: its JSON, its locators and its URL"""
+    case = {key: value for key, value in test_case.items() if key not in ('plan', 'variants')}
+    digest = hashlib.sha256()
+    digest.update(json.dumps(case, sort_keys=True).encode())
+    digest.update(locator_source(locators))
+    digest.update(url.encode())
+    return digest.hexdigest()[:16]
+
+
+def load_history(path=FINGERPRINTS_FILE):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'last_full_run': 0, 'tests': {}}
+
+
+def full_run_due(history, hours=DEFAULT_FULL_RUN_HOURS):
+    return time.time() - history.get('last_full_run', 0) > hours * 3600
+
+
+def select_changed(test_cases, fingerprints, history):
+    """Split test cases into (to_run, unchanged): unchanged ones passed last time with the same fingerprint"""
+    to_run, unchanged = [], []
+    for test_case in test_cases:
+        last = history['tests'].get(test_case['id'])
+        if last and last['fingerprint'] == fingerprints[test_case['id']] and last['result']['status'] == 'PASSED':
+            unchanged.append(test_case)
+        else:
+            to_run.append(test_case)
+    return to_run, unchanged
+
+
+def cached_result(history, test_id):
+    """The stored result of an unchanged test, marked so reports can tell it was not rerun"""
+    result = dict(history['tests'][test_id]['result'])
+    result['cached'] = True
+    return result
+
+
+def record_results(results, fingerprints, history, full_run=False, path=FINGERPRINTS_FILE):
+    """Store the last result per test together with the fingerprint it ran against"""
+    for result in results:
+        if result.get('cached') or result['id'] not in fingerprints:
+            continue
+        stored = {key: value for key, value in result.items() if key not in ('worker', 'pool_stats')}
+        history['tests'][result['id']] = {'fingerprint': fingerprints[result['id']], 'result': stored, 'ran_at': round(time.time())}
+    if full_run:
+        history['last_full_run'] = round(time.time())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -0,0 +1,156 @@
+import itertools
+from urllib.parse import urlparse
+
+# A test case can declare "inputMatrix": {field: [values] | {"generator": name, ...params}}.
+# Each combination of values (cartesian product, or "matrixMode": "zip" to pair them up) becomes a
+# variant of the test's inputs. Variants run back to back in the same page: the form is reset
+# between them instead of opening a new context, and the page is reloaded when the reset does not bring
+# it back to the state the first variant started from ("matrixReset": "reload" always reloads).
+
+
+def invalid_emails():
+    """Addresses the browser's type=email check rejects with a message that mentions '@'"""
+    return ['invalid-email', 'user@', '@example.com', 'user@@example.com', 'user name@example.com', 'user@exa mple.com']
+
+
+def invalid_phone_numbers():
+    return ['123', '12345', '123456789', '12345678901', '(702) 123-456', 'abc']
+
+
+def short_passwords(min_length=1, max_length=7, char='a'):
+    return [char * n for n in range(min_length, max_length + 1)]
+
+
+GENERATORS = {
+    'invalid_emails': invalid_emails,
+    'invalid_phone_numbers': invalid_phone_numbers,
+    'short_passwords': short_passwords,
+}
+
+# Clears every form on the page in a way controlled inputs (React etc.) notice as well
+RESET_FORMS_JS = """() => {
+    const setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    document.querySelectorAll('form').forEach(form => form.reset());
+    document.querySelectorAll('input:not([type=hidden]):not([type=checkbox]):not([type=radio]), textarea').forEach(input => {
+        setValue.call(input, '');
+        input.dispatchEvent(new Event('input', {bubbles: true}));
+        input.dispatchEvent(new Event('change', {bubbles: true}));
+    });
+    if (document.activeElement) document.activeElement.blur();
+}"""
+
+# What a test could observe of the page: the path, which elements are rendered, their text and what
+# the inputs hold. A form reset leaves e.g. a validation message shown by the previous variant in place,
+# which this tells apart from the state the first variant started from.
+STATE_JS = """() => {
+    const visible = el => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const parts = [location.pathname];
+    document.body.querySelectorAll('*').forEach(el => {
+        if (!visible(el)) return;
+        let part = el.tagName + (el.id ? '#' + el.id : '');
+        if (!el.childElementCount && el.textContent.trim()) part += ':' + el.textContent.trim();
+        if (el.tagName === 'INPUT' || el.tagName === 'TEXTAREA' || el.tagName === 'SELECT') {
+            part += `[${el.type}]=${el.value}` + (el.checked ? ':checked' : '');
+        }
+        parts.push(part);
+    });
+    return parts.join('|');
+}"""
+
+
+def _values(field, spec):
+    if isinstance(spec, list):
+        return spec
+    if isinstance(spec, dict) and spec.get('generator') in GENERATORS:
+        params = {key: value for key, value in spec.items() if key != 'generator'}
+        return list(GENERATORS[spec['generator']](**params))
+    raise ValueError(f"inputMatrix.{field} must be a list or {{\"generator\": one of {', '.join(GENERATORS)}}}")
+
+
+def expand_variants(test_case):
+    """[(label, inputs)] for each combination in the test's inputMatrix; [] for ordinary test cases"""
+    matrix = test_case.get('inputMatrix')
+    if not matrix:
+        return []
+    fields = list(matrix)
+    columns = [_values(field, matrix[field]) for field in fields]
+    if test_case.get('matrixMode') == 'zip':
+        rows = zip(*columns)
+    else:
+        rows = itertools.product(*columns)
+    variants = []
+    for row in rows:
+        inputs = dict(test_case.get('inputs', {}))
+        inputs.update(zip(fields, row))
+        label = ', '.join(f"{field}={value!r}" for field, value in zip(fields, row))
+        variants.append((label, inputs))
+    return variants
+
+
+def _needs_navigation(page, start_url, mode):
+    return mode == 'reload' or urlparse(page.url).path != urlparse(start_url).path
+
+
+def reset_page(page, start_url, mode='form', timeout=5000, baseline=None):
+    """Bring the page back to a clean form before the next variant, reloading it if the reset does not reach baseline"""
+    if not _needs_navigation(page, start_url, mode):
+        page.evaluate(RESET_FORMS_JS)
+        if baseline is None or page.evaluate(STATE_JS) == baseline:
+            return
+    page.goto(start_url, timeout=timeout)
+
+
+async def reset_page_async(page, start_url, mode='form', timeout=5000, baseline=None):
+    if not _needs_navigation(page, start_url, mode):
+        await page.evaluate(RESET_FORMS_JS)
+        if baseline is None or await page.evaluate(STATE_JS) == baseline:
+            return
+    await page.goto(start_url, timeout=timeout)
+
+
+def run_variants(page, plans, start_url, execute, mode='form', on_failure=None):
+    """Run execute(plan) for each variant plan in the same page; returns errors tagged with the variant
+
+    on_failure(plan) is called right after a variant fails, before the next one starts.
+    """
+    errors = []
+    dirty = False
+    # The state the first variant starts from; later variants start from it too
+    baseline = page.evaluate(STATE_JS) if len(plans) > 1 else None
+    for n, plan in enumerate(plans):
+        if n:
+            # After a step blew up the page state is unknown, so start that next variant from a fresh load
+            reset_page(page, start_url, 'reload' if dirty else mode, baseline=baseline)
+        try:
+            variant_errors = execute(plan)
+            dirty = False
+        except Exception as e:
+            variant_errors = [str(e).splitlines()[0]]
+            dirty = True
+        if variant_errors and on_failure:
+            on_failure(plan)
+        errors.extend(f"[{plan.variant}] {error}" for error in variant_errors)
+    return errors
+
+
+async def run_variants_async(page, plans, start_url, execute, mode='form', on_failure=None):
+    """Async counterpart of run_variants"""
+    errors = []
+    dirty = False
+    baseline = await page.evaluate(STATE_JS) if len(plans) > 1 else None
+    for n, plan in enumerate(plans):
+        if n:
+            await reset_page_async(page, start_url, 'reload' if dirty else mode, baseline=baseline)
+        try:
+            variant_errors = await execute(plan)
+            dirty = False
+        except Exception as e:
+            variant_errors = [str(e).splitlines()[0]]
+            dirty = True
+        if variant_errors and on_failure:
+            on_failure(plan)
+        errors.extend(f"[{plan.variant}] {error}" for error in variant_errors)
+    return errors
@@ -0,0 +1,238 @@
+import os
+import math
+import json
+import time
+import asyncio
+from collections import Counter
+from dataclasses import replace
+from playwright.async_api import async_playwright
+
+from browser_pool import DEFAULT_LAUNCH_ARGS
+from wait_strategies import WaitRecorder
+from artifact_policy import CapturePolicy, CaptureSession
+from asset_cache import install_routes_async, RouteStats
+from timings import PhaseTimer
+from async_engine import execute_test_steps
+from compiled_plan import TestPlan
+
+# Each scenario is the functional test case with this function, run through async_engine's
+# execute_test_steps by many virtual users at once, every artifact turned off
+SCENARIOS = {
+    'login': 'testSuccessfulLogin',
+    'signup': 'testSuccessfulSignUp',
+}
+LOAD_FILE = os.path.join('artifacts', 'load.json')
+NO_CAPTURE = CapturePolicy(video='off', screenshots='off', trace='off')
+PAGE_TIMEOUT = 10000
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile; None for no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def unique_email(email, token):
+    """email with a +token tag, so every signup registers a new address"""
+    local, at, domain = email.partition('@')
+    return f"{local}+{token}@{domain}" if at else f"{email}+{token}"
+
+
+class RedirectTimer(PhaseTimer):
+    """Keeps the click and wait durations of one iteration to derive click-to-redirect latency"""
+
+    def __init__(self, test_id):
+        super().__init__(test_id, path=None)
+        self.clicks = {}
+        self.waits = []
+
+    def add(self, phase, duration_ms, error=None, **fields):
+        super().add(phase, duration_ms, error, **fields)
+        if phase == 'step' and fields.get('kind') == 'click':
+            self.clicks[fields['step']] = duration_ms
+        elif phase == 'wait':
+            self.waits.append((fields['step'], duration_ms))
+
+    def redirects(self, recorder):
+        """[(latency_ms, met)] for every click followed by a wait for the URL to change"""
+        found = []
+        for (step, wait_ms), record in zip(self.waits, recorder.records):
+            if record['kind'] == 'url_change':
+                found.append((self.clicks.get(step, 0.0) + wait_ms, record['met']))
+        return found
+
+
+class Scenario:
+    """One flow driven by the virtual users: a test case prepared once, its fills optionally swapped per iteration"""
+
+    def __init__(self, name, test_case, prepared, fills=None, unique_field=None):
+        self.name = name
+        self.test_case = test_case
+        self.prepared = prepared
+        self.fills = fills or {}
+        # Input whose value gets a fresh token every iteration (the signup email)
+        self.unique_field = unique_field
+
+    def plan(self, token):
+        fills = dict(self.fills)
+        inputs = self.test_case.get('inputs', {})
+        if self.unique_field and inputs.get(self.unique_field):
+            original = inputs[self.unique_field]
+            fills[original] = unique_email(fills.get(original, original), token)
+        plan = self.prepared['plan']
+        if not fills:
+            return plan
+        steps = [replace(step, value=fills[step.value]) if step.kind == 'fill' and step.value in fills else step
+                 for step in plan.steps]
+        return TestPlan(plan.test_id, steps, list(plan.errors), plan.variant)
+
+
+def build_scenarios(test_cases, names, prepare, credentials=None):
+    """Scenarios for the given names from the loaded test cases; credentials replace the login test's own"""
+    scenarios = []
+    for name in names:
+        test_case = next((tc for tc in test_cases if tc.get('function') == SCENARIOS[name]), None)
+        if test_case is None:
+            raise ValueError(f"No test case with function {SCENARIOS[name]} for the {name} scenario")
+        inputs = test_case.get('inputs', {})
+        fills = {}
+        if name == 'login' and credentials and all(credentials):
+            fills = {inputs[key]: value for key, value in zip(('email', 'password'), credentials) if inputs.get(key)}
+        scenarios.append(Scenario(name, test_case, prepare(test_case), fills,
+                                  unique_field='email' if name == 'signup' else None))
+    return scenarios
+
+
+class LoadStats:
+    """Iterations, errors and redirect latencies per scenario"""
+
+    def __init__(self):
+        self.scenarios = {}
+
+    def _entry(self, name):
+        return self.scenarios.setdefault(name, {'iterations': 0, 'errors': Counter(), 'samples': {}, 'latencies': []})
+
+    def record(self, name, latencies=(), error=None):
+        entry = self._entry(name)
+        entry['iterations'] += 1
+        entry['latencies'].extend(latencies)
+        if error:
+            kind, message = error
+            entry['errors'][kind] += 1
+            entry['samples'].setdefault(kind, message)
+
+    def summary(self, elapsed_s, users, ramp_up):
+        def describe(iterations, errors, latencies):
+            failed = sum(errors.values())
+            return {
+                'iterations': iterations,
+                'errors': failed,
+                'error_rate': round(failed / iterations, 4) if iterations else 0.0,
+                'throughput_per_s': round(iterations / elapsed_s, 2) if elapsed_s else 0.0,
+                'redirects_per_s': round(len(latencies) / elapsed_s, 2) if elapsed_s else 0.0,
+                'latency_ms': {f"p{p}": percentile(latencies, p) for p in PERCENTILES},
+                'error_kinds': dict(errors),
+            }
+
+        scenarios = {}
+        total_errors, all_latencies, total_iterations = Counter(), [], 0
+        for name, entry in self.scenarios.items():
+            scenarios[name] = describe(entry['iterations'], entry['errors'], entry['latencies'])
+            scenarios[name]['error_samples'] = entry['samples']
+            total_iterations += entry['iterations']
+            total_errors.update(entry['errors'])
+            all_latencies.extend(entry['latencies'])
+        overall = describe(total_iterations, total_errors, all_latencies)
+        overall.update({'users': users, 'ramp_up_s': ramp_up, 'elapsed_s': round(elapsed_s, 1), 'scenarios': scenarios})
+        return overall
+
+
+async def run_iteration(browser, scenario, stats, token):
+    """One session in a fresh context: open the page, run the scenario's steps, time the redirect"""
+    prepared = scenario.prepared
+    context = await browser.new_context(ignore_https_errors=True)
+    try:
+        if prepared['asset_cache'] or prepared['block_mode'] != 'none':
+            await install_routes_async(context, prepared['asset_cache'], RouteStats(), prepared['block_mode'], prepared['first_party_host'])
+        page = await context.new_page()
+        await page.goto(prepared['url'], timeout=PAGE_TIMEOUT)
+        timer = RedirectTimer(scenario.test_case['id'])
+        waits = WaitRecorder()
+        capture = CaptureSession(NO_CAPTURE, None, None, None)
+        errors = await execute_test_steps(page, scenario.test_case, capture, prepared['locators'], waits, scenario.plan(token), timer)
+        redirects = timer.redirects(waits)
+        latencies = [ms for ms, met in redirects if met]
+        if len(latencies) < len(redirects):
+            stats.record(scenario.name, latencies, ('no-redirect', f"URL did not change within the wait budget (at {page.url})"))
+        elif errors:
+            stats.record(scenario.name, latencies, ('assertion', errors[0]))
+        else:
+            stats.record(scenario.name, latencies)
+    except Exception as e:
+        stats.record(scenario.name, error=(type(e).__name__, str(e).splitlines()[0] if str(e) else type(e).__name__))
+    finally:
+        await context.close()
+
+
+async def virtual_user(number, browser, scenarios, start_at, stop_at, stats):
+    """Run sessions back to back from start_at until stop_at, cycling through the scenarios"""
+    await asyncio.sleep(max(0.0, start_at - time.perf_counter()))
+    iteration = 0
+    while time.perf_counter() < stop_at:
+        scenario = scenarios[(number + iteration) % len(scenarios)]
+        await run_iteration(browser, scenario, stats, f"load{number}-{iteration}-{int(time.time())}")
+        iteration += 1
+
+
+async def run_load_async(scenarios, users, ramp_up=0.0, duration=60.0, browsers=1, headless=True):
+    stats = LoadStats()
+    async with async_playwright() as p:
+        launched = await asyncio.gather(*[
+            p.chromium.launch(headless=headless, args=DEFAULT_LAUNCH_ARGS) for _ in range(max(1, browsers))
+        ])
+        try:
+            # Users start evenly spread over the ramp-up; the duration includes the ramp-up, and
+            # sessions in flight when it ends are allowed to finish
+            started = time.perf_counter()
+            stop_at = started + duration
+            await asyncio.gather(*[
+                virtual_user(n, launched[n % len(launched)], scenarios, started + ramp_up * n / users, stop_at, stats)
+                for n in range(users)
+            ])
+            elapsed = time.perf_counter() - started
+        finally:
+            for browser in launched:
+                await browser.close()
+    return stats.summary(elapsed, users, ramp_up)
+
+
+def run_load(scenarios, users, ramp_up=0.0, duration=60.0, browsers=1, headless=True):
+    """Blocking entry point used by the runner's --load mode; returns the summary dict"""
+    return asyncio.run(run_load_async(scenarios, max(1, users), ramp_up, duration, browsers, headless))
+
+
+def save_load_summary(summary, path=LOAD_FILE):
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+def _format_latency(latency):
+    return ' '.join(f"{name} {value:.0f}ms" if value is not None else f"{name} n/a" for name, value in latency.items())
+
+
+def print_load_summary(summary):
+    print("\n" + "=" * 50)
+    print("📈 LOAD SUMMARY")
+    print("=" * 50)
+    print(f"Users: {summary['users']} (ramp-up {summary['ramp_up_s']:g}s), elapsed {summary['elapsed_s']:g}s")
+    for name, scenario in summary['scenarios'].items():
+        print(f"\n{name}: {scenario['iterations']} sessions, {scenario['throughput_per_s']}/s, "
+              f"errors {scenario['errors']} ({scenario['error_rate'] * 100:.1f}%)")
+        print(f"   click → redirect: {_format_latency(scenario['latency_ms'])}")
+        for kind, count in scenario['error_kinds'].items():
+            print(f"   ❌ {kind} x{count}: {scenario['error_samples'][kind]}")
+    print(f"\nTotal: {summary['iterations']} sessions, {summary['throughput_per_s']}/s, "
+          f"error rate {summary['error_rate'] * 100:.1f}%, click → redirect {_format_latency(summary['latency_ms'])}")
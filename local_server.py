@@ -0,0 +1,247 @@
+import os
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+# Stand-in for the login/signup app, matching login_locators.py, signup_locators.py and common_locators.py
+
+DEFAULT_USERS = {'demo@example.com': 'Demo@12345'}
+
+LOGO_SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="120" height="32"><rect width="120" height="32" rx="6" fill="#4f46e5"/><text x="12" y="21" fill="#fff" font-family="Arial" font-size="14">SnapPod</text></svg>"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 0; background: #f5f5f5; }}
+        #root {{ max-width: 420px; margin: 40px auto; background: #fff; padding: 24px; border-radius: 8px; }}
+        label {{ display: block; margin-top: 12px; }}
+        input {{ width: 100%; padding: 8px; box-sizing: border-box; }}
+        button {{ margin-top: 12px; padding: 8px 12px; }}
+        .error {{ color: #c00; }}
+        .modal {{ position: fixed; inset: 0; background: rgba(0,0,0,.4); }}
+        .modal > div {{ background: #fff; max-width: 360px; margin: 80px auto; padding: 20px; border-radius: 8px; }}
+        [hidden] {{ display: none !important; }}
+    </style>
+</head>
+<body>
+<div id="root">
+{body}
+</div>
+<script>
+{script}
+</script>
+</body>
+</html>"""
+
+LOGIN_BODY = """    <img src="/static/logo.svg" alt="SnapPod Logo">
+    <h2>Welcome Back!</h2>
+    <form id="login-form">
+        <label for="login-email">Email <span>*</span></label>
+        <input id="login-email" name="email" type="email" required>
+        <label for="login-password">Password <span>*</span></label>
+        <input id="login-password" name="password" type="password" required>
+        <button type="button" aria-label="Show password" id="toggle-password">👁</button>
+        <div><a href="#" id="forgot-password">Forgot Password</a></div>
+        <p class="error" id="login-error" hidden></p>
+        <button type="submit">Login</button>
+    </form>
+    <p>or</p>
+    <button type="button" aria-label="Sign in with Google" id="google-login">Sign in with Google</button>
+    <div>Don't have an account? <a href="/signup">Sign Up Here</a></div>
+    <p id="reset-success" hidden></p>
+    <div class="modal" id="forgot-modal" hidden>
+        <div>
+            <button type="button" aria-label="Close forgot password modal" id="close-modal">×</button>
+            <h3>Reset Password</h3>
+            <p>Enter your email to receive a reset code</p>
+            <form id="reset-form">
+                <label for="reset-email">Email Address</label>
+                <input id="reset-email" type="email" placeholder="Enter your email address" required>
+                <button type="submit">Send Reset Code</button>
+            </form>
+        </div>
+    </div>"""
+
+LOGIN_SCRIPT = """const $ = (id) => document.getElementById(id);
+$('toggle-password').onclick = () => {
+    const input = $('login-password');
+    input.type = input.type === 'password' ? 'text' : 'password';
+};
+$('forgot-password').onclick = (e) => { e.preventDefault(); $('forgot-modal').hidden = false; };
+$('close-modal').onclick = () => { $('forgot-modal').hidden = true; };
+$('google-login').onclick = () => { location.href = '/oauth/accounts.google.com/signin'; };
+$('reset-form').onsubmit = async (e) => {
+    e.preventDefault();
+    await fetch('/api/reset', {method: 'POST', body: JSON.stringify({email: $('reset-email').value})});
+    $('forgot-modal').hidden = true;
+    $('reset-success').textContent = 'Password reset email sent. Please check your inbox.';
+    $('reset-success').hidden = false;
+};
+$('login-form').onsubmit = async (e) => {
+    e.preventDefault();
+    const response = await fetch('/api/login', {method: 'POST', body: JSON.stringify({
+        email: $('login-email').value, password: $('login-password').value})});
+    if (response.ok) {
+        location.href = '/dashboard';
+    } else {
+        $('login-error').textContent = 'Invalid credentials. Please try again.';
+        $('login-error').hidden = false;
+    }
+};"""
+
+SIGNUP_BODY = """    <img src="/static/logo.svg" alt="Logo">
+    <h1>Start creating!</h1>
+    <p>Already have an account? <a href="/login">Sign In Here</a></p>
+    <button type="button" aria-label="Sign up with Google" id="google-signup"><span>Sign up with Google</span></button>
+    <button type="button" aria-label="Sign up with Facebook" id="facebook-signup"><span>Sign up with Facebook</span></button>
+    <form id="signup-form">
+        <label for="first-name">First Name <span>*</span></label>
+        <input id="first-name" name="firstName" placeholder="Enter your first name" required>
+        <label for="last-name">Last Name <span>*</span></label>
+        <input id="last-name" name="lastName" placeholder="Enter your last name" required>
+        <label for="phone">Phone Number</label>
+        <input id="phone" name="phone" placeholder="1 (702) 123-4567">
+        <label for="signup-email">Email <span>*</span></label>
+        <input id="signup-email" name="email" type="email" placeholder="Enter your Email Address" required>
+        <label for="signup-password">Password <span>*</span></label>
+        <input id="signup-password" name="password" type="password" placeholder="Enter password" required>
+        <label for="confirm-password">Re-Enter Password <span>*</span></label>
+        <input id="confirm-password" name="confirmPassword" type="password" placeholder="Re-Enter your Password" required>
+        <p class="error" id="signup-error" hidden></p>
+        <button type="submit">Sign Up</button>
+    </form>"""
+
+SIGNUP_SCRIPT = """const $ = (id) => document.getElementById(id);
+$('google-signup').onclick = () => { location.href = '/oauth/accounts.google.com/signup'; };
+$('facebook-signup').onclick = () => { location.href = '/oauth/www.facebook.com/login'; };
+$('signup-form').onsubmit = async (e) => {
+    e.preventDefault();
+    const fail = (message) => { $('signup-error').textContent = message; $('signup-error').hidden = false; };
+    const password = $('signup-password').value;
+    const phone = $('phone').value.replace(/\\D/g, '');
+    if (password !== $('confirm-password').value) return fail('Passwords do not match.');
+    if (password.length < 8) return fail('Password must be at least 8 characters long.');
+    if ($('phone').value && phone.length !== 10) return fail('Please enter a valid phone number.');
+    const response = await fetch('/api/signup', {method: 'POST', body: JSON.stringify({email: $('signup-email').value})});
+    if (response.ok) location.href = '/dashboard';
+    else fail('Signup failed. Please try again.');
+};"""
+
+DASHBOARD_BODY = """    <img src="/static/logo.svg" alt="Logo">
+    <h1>Dashboard</h1>
+    <p id="session"></p>"""
+
+DASHBOARD_SCRIPT = """if (!document.cookie.includes('session=')) location.href = '/login';"""
+
+OAUTH_BODY = """    <h1>Sign in</h1>
+    <p>Stand-in for the third-party authentication page.</p>"""
+
+PAGES = {
+    '/login': ('Login', LOGIN_BODY, LOGIN_SCRIPT),
+    '/signup': ('Sign Up', SIGNUP_BODY, SIGNUP_SCRIPT),
+    '/dashboard': ('Dashboard', DASHBOARD_BODY, DASHBOARD_SCRIPT),
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    users = DEFAULT_USERS
+
+    def log_message(self, format, *args):
+        pass  # keep test output clean
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlparse(self.path).path.rstrip('/') or '/login'
+        if path in PAGES:
+            title, body, script = PAGES[path]
+            self._send(200, PAGE_TEMPLATE.format(title=title, body=body, script=script))
+        elif path == '/static/logo.svg':
+            self._send(200, LOGO_SVG, 'image/svg+xml', {'Cache-Control': 'max-age=3600'})
+        elif path.startswith('/oauth/'):
+            self._send(200, PAGE_TEMPLATE.format(title='Sign in', body=OAUTH_BODY, script=''))
+        else:
+            self._send(404, 'Not found', 'text/plain')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            payload = {}
+        path = urlparse(self.path).path
+        if path == '/api/login':
+            if self.users.get(payload.get('email')) == payload.get('password'):
+                self._send(200, '{"ok": true}', 'application/json', {'Set-Cookie': 'session=local; Path=/'})
+            else:
+                self._send(401, '{"ok": false}', 'application/json')
+        elif path == '/api/signup':
+            self._send(200, '{"ok": true}', 'application/json', {'Set-Cookie': 'session=local; Path=/'})
+        elif path == '/api/reset':
+            self._send(200, '{"ok": true}', 'application/json')
+        else:
+            self._send(404, '{"ok": false}', 'application/json')
+
+
+class LocalAppServer:
+    """Serves the stand-in app from a background thread of this process"""
+
+    def __init__(self, host='127.0.0.1', port=0, users=None):
+        accepted = dict(DEFAULT_USERS)
+        if os.environ.get('TEST_USER_EMAIL') and os.environ.get('TEST_USER_PASSWORD'):
+            accepted[os.environ['TEST_USER_EMAIL']] = os.environ['TEST_USER_PASSWORD']
+        accepted.update(users or {})
+        handler = type('LocalHandler', (StandInHandler,), {'users': accepted})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='local-app-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def retarget_url(url, base_url):
+    """Point an absolute URL at base_url, keeping its path and query"""
+    parsed = urlparse(url)
+    if not parsed.scheme or not base_url:
+        return url
+    target = urlparse(base_url)
+    return parsed._replace(scheme=target.scheme, netloc=target.netloc).geturl()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve the stand-in login/signup app')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = LocalAppServer(port=args.port).start()
+    print(f"🏠 Stand-in app running at {server.base_url}/login (Ctrl+C to stop)")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
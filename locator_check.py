@@ -0,0 +1,115 @@
+import os
+import re
+import json
+
+SLOW_MS = 50  # a selector taking longer than this to match in the page is reported as slow
+HEALTH_FILE = os.path.join('artifacts', 'locator_health.json')
+
+HAS_TEXT = re.compile(r"""^(.*?):has-text\((['"])(.*)\2\)$""")
+
+# Resolves every selector of a page in one evaluation; :has-text is matched like Playwright does
+# (case-insensitive substring of the element's text, whitespace collapsed)
+RESOLVE_ALL_JS = """(entries) => entries.map(({name, css, text}) => {
+    const started = performance.now();
+    let matches = [], error = null;
+    try {
+        matches = Array.from(document.querySelectorAll(css || '*'));
+        if (text !== null) {
+            const needle = text.toLowerCase().replace(/\\s+/g, ' ').trim();
+            matches = matches.filter(el => (el.textContent || '').toLowerCase().replace(/\\s+/g, ' ').includes(needle));
+        }
+    } catch (e) {
+        error = String(e);
+    }
+    const visible = matches.filter(el => el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden').length;
+    return {name, count: matches.length, visible, ms: performance.now() - started, error};
+})"""
+
+
+def translate(selector):
+    """Split a Playwright selector into (css, text) for RESOLVE_ALL_JS, or None if it uses another engine"""
+    if '>>' in selector or re.match(r'^(text|xpath|id|data-testid|role)=', selector) or selector.startswith('//'):
+        return None
+    match = HAS_TEXT.match(selector)
+    if match:
+        return match.group(1), match.group(3)
+    if ':has-text(' in selector or ':text(' in selector:
+        return None
+    return selector, None
+
+
+def classify(entry, slow_ms=SLOW_MS):
+    if entry.get('error'):
+        return 'invalid'
+    if entry['count'] == 0:
+        return 'missing'
+    if entry['count'] > 1:
+        return 'ambiguous'
+    if entry['ms'] > slow_ms:
+        return 'slow'
+    return 'ok'
+
+
+def check_page(page, selectors, slow_ms=SLOW_MS, skip=()):
+    """Resolve {name: selector} on an already loaded page with a single page.evaluate
+
+    Names in skip (elements that only appear after an interaction) are reported as not checked.
+    """
+    entries, unsupported = [], []
+    for name, selector in selectors.items():
+        translated = translate(selector)
+        if name in skip:
+            unsupported.append({'name': name, 'selector': selector, 'status': 'not-checked'})
+        elif translated is None:
+            unsupported.append({'name': name, 'selector': selector, 'status': 'unsupported'})
+        else:
+            entries.append({'name': name, 'css': translated[0], 'text': translated[1]})
+    results = page.evaluate(RESOLVE_ALL_JS, entries)
+    for entry in results:
+        entry['selector'] = selectors[entry['name']]
+        entry['ms'] = round(entry['ms'], 2)
+        entry['status'] = classify(entry, slow_ms)
+    return results + unsupported
+
+
+def check_modules(pool, modules, get_url, get_locators, slow_ms=SLOW_MS, timeout=10000):
+    """Open each module's URL once and check every selector in its locator file; returns {module: [entries]}"""
+    report = {}
+    for module_name in modules:
+        locators = get_locators(module_name)
+        if not locators.page_selectors:
+            continue
+        context = pool.new_context(ignore_https_errors=True)
+        try:
+            page = context.new_page()
+            page.goto(get_url(module_name), timeout=timeout)
+            page.wait_for_load_state('domcontentloaded', timeout=timeout)
+            report[module_name] = check_page(page, locators.page_selectors, slow_ms, skip=locators.interaction_dependent)
+        except Exception as e:
+            report[module_name] = [{'name': '*', 'selector': get_url(module_name), 'status': 'page-error', 'error': str(e)}]
+        finally:
+            context.close()
+    return report
+
+
+def print_locator_report(report):
+    """Print problems per module; returns the number of missing, invalid or unreachable selectors"""
+    blocking = 0
+    for module_name, entries in report.items():
+        not_checked = [e for e in entries if e['status'] == 'not-checked']
+        problems = [e for e in entries if e['status'] not in ('ok', 'not-checked')]
+        checked = len(entries) - len(not_checked)
+        note = f", {len(not_checked)} not checked (only present after an interaction)" if not_checked else ''
+        print(f"\n🔎 {module_name}: {checked - len(problems)}/{checked} selectors OK{note}")
+        for entry in problems:
+            detail = entry.get('error') or f"{entry.get('count', '?')} match(es), {entry.get('visible', '?')} visible, {entry.get('ms', '?')}ms"
+            icon = '⚠️ ' if entry['status'] in ('ambiguous', 'slow', 'unsupported') else '❌'
+            print(f"   {icon} {entry['status']:<11} {entry['name']} = {entry['selector']}  ({detail})")
+            if entry['status'] in ('missing', 'invalid', 'page-error'):
+                blocking += 1
+    return blocking
+
+
+def save_locator_report(report, path=HEALTH_FILE):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
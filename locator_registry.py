@@ -0,0 +1,147 @@
+import difflib
+import importlib
+
+# Locator files live in config/ in the generated layout and next to this file otherwise
+SEARCH_PACKAGES = ('config', None)
+COMMON_MODULE = 'common_locators'
+
+# Names the runner's own code asks for, mapped to the attribute in each page's locator file.
+# Every mapping is checked the first time its module is loaded.
+ALIASES = {
+    'login': {
+        'email_input': 'enter_your_email_add_input',
+        'password_input': 'enter_your_password_input',
+        'submit_button': 'login_button',
+        'forgot_password_link': 'forgot_password_link',
+        'reset_password_heading': 'reset_password_h3',
+    },
+    'signup': {
+        'email_input': 'email_input',
+        'password_input': 'password_input',
+        'submit_button': 'signup_button',
+    },
+}
+
+# Locators of elements that only exist after an interaction (the forgot password modal, messages shown
+# after a submit). A freshly loaded page cannot confirm them, so --check-locators reports them as not
+# checked instead of missing. Every name is checked to exist the first time its module is loaded.
+INTERACTION_DEPENDENT = {
+    'login': (
+        'reset_password_close_button',
+        'reset_password_h3',
+        'reset_password_desc_p',
+        'reset_password_email_input',
+        'reset_password_send_code_button',
+    ),
+}
+
+DEFAULT_URLS = {
+    'login': 'https://dev.vox.snappod.ai/login',
+    'signup': 'https://dev.vox.snappod.ai/signup',
+    'dashboard': 'https://dev.vox.snappod.ai/dashboard',
+}
+
+
+class LocatorError(AttributeError):
+    """A locator name that does not exist in the page's locator file, or a module without a URL"""
+
+
+def _import_first(name):
+    """Import name from the first package in SEARCH_PACKAGES that has it, or None if none does"""
+    for package in SEARCH_PACKAGES:
+        qualified = f"{package}.{name}" if package else name
+        try:
+            return importlib.import_module(qualified)
+        except ModuleNotFoundError as e:
+            # Only "this file doesn't exist here" is expected; a broken import inside the file is not
+            if e.name not in (qualified, package):
+                raise
+    return None
+
+
+def _selectors(module):
+    if module is None:
+        return {}
+    return {name: value for name, value in vars(module).items() if not name.startswith('_') and isinstance(value, str)}
+
+
+class ModuleLocators:
+    """The selectors for one page (its locator file over the common ones), looked up by attribute"""
+
+    def __init__(self, module_name, selectors, aliases, source=None, page_selectors=None, interaction_dependent=()):
+        self.module_name = module_name
+        self.selectors = selectors
+        self.aliases = aliases
+        self.source = source
+        # Just the ones defined in the page's own locator file
+        self.page_selectors = page_selectors or {}
+        self.interaction_dependent = frozenset(interaction_dependent)
+
+    def __getattr__(self, name):
+        # Only reached for names that are not real attributes
+        if name.startswith('__'):
+            raise AttributeError(name)
+        selectors = self.__dict__.get('selectors', {})
+        name = self.__dict__.get('aliases', {}).get(name, name)
+        if name in selectors:
+            return selectors[name]
+        raise LocatorError(self.missing_message(name))
+
+    def missing_message(self, name):
+        known = list(self.selectors) + list(self.aliases)
+        suggestions = difflib.get_close_matches(name, known, n=3)
+        hint = f"; did you mean {', '.join(suggestions)}?" if suggestions else ''
+        return f"No locator '{name}' for module '{self.module_name}' ({self.source or 'no locator file'}){hint}"
+
+
+class LocatorRegistry:
+    """Loads each page's locators and URL once per process and checks the runner's aliases against them"""
+
+    def __init__(self, aliases=ALIASES, interaction_dependent=INTERACTION_DEPENDENT):
+        self.aliases = aliases
+        self.interaction_dependent = interaction_dependent
+        self._locators = {}
+        self._urls = None
+        self._common = None
+
+    def locators(self, module_name):
+        module_name = module_name.lower()
+        if module_name not in self._locators:
+            self._locators[module_name] = self._load(module_name)
+        return self._locators[module_name]
+
+    def _load(self, module_name):
+        if self._common is None:
+            self._common = _selectors(_import_first(COMMON_MODULE))
+        module = _import_first(f"{module_name}_locators")
+        page_selectors = _selectors(module)
+        selectors = dict(self._common)
+        selectors.update(page_selectors)
+        locators = ModuleLocators(module_name, selectors, self.aliases.get(module_name, {}),
+                                  source=getattr(module, '__file__', None), page_selectors=page_selectors,
+                                  interaction_dependent=self.interaction_dependent.get(module_name, ()))
+        broken = [(alias, target) for alias, target in locators.aliases.items() if target not in selectors]
+        broken += [('interaction-dependent', name) for name in sorted(locators.interaction_dependent) if name not in selectors]
+        if broken:
+            raise LocatorError('; '.join(f"{alias} -> {locators.missing_message(target)}" for alias, target in broken))
+        return locators
+
+    def url(self, module_name):
+        if self._urls is None:
+            urls = _import_first('urls')
+            self._urls = {name: getattr(urls, f"{name.upper()}_URL", default) for name, default in DEFAULT_URLS.items()}
+        module_name = module_name.lower()
+        if module_name not in self._urls:
+            raise LocatorError(f"No URL for module '{module_name}', expected one of {', '.join(sorted(self._urls))}")
+        return self._urls[module_name]
+
+
+_registry = None
+
+
+def get_locator_registry():
+    """This process's registry, created on first use"""
+    global _registry
+    if _registry is None:
+        _registry = LocatorRegistry()
+    return _registry
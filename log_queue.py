@@ -0,0 +1,114 @@
+import os
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = 'tests'
+LOG_ROOT = 'artifacts'
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+FIELDS = ('phase', 'duration_ms')  # structured fields appended to a line when a record has them
+MAX_OPEN_FILES = 32
+
+
+class TestLogger(logging.LoggerAdapter):
+    """A test's logger: every record carries test_id, merged with any extra= fields of the call"""
+
+    def process(self, msg, kwargs):
+        kwargs['extra'] = dict(self.extra, **kwargs.get('extra', {}))
+        return msg, kwargs
+
+
+class FieldsFormatter(logging.Formatter):
+    """LOG_FORMAT plus ' [phase=goto duration_ms=812.4]' for the structured fields a record has"""
+
+    def format(self, record):
+        line = super().format(record)
+        fields = ' '.join(f"{name}={getattr(record, name)}" for name in FIELDS if getattr(record, name, None) is not None)
+        return f"{line} [{fields}]" if fields else line
+
+
+class PerTestFileHandler(logging.Handler):
+    """Writes each record to {root}/{test_id}/test.log (records without a test id go to {root}/run.log)
+
+    Only the listener thread calls emit, so the open files need no locking
+    beyond the handler's own; the least recently used ones are closed past
+    MAX_OPEN_FILES.
+    """
+
+    def __init__(self, root=LOG_ROOT, max_open=MAX_OPEN_FILES):
+        super().__init__()
+        self.root = root
+        self.max_open = max_open
+        self.files = OrderedDict()
+
+    def _file(self, test_id):
+        path = os.path.join(self.root, test_id, 'test.log') if test_id else os.path.join(self.root, 'run.log')
+        f = self.files.pop(path, None)
+        if f is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = open(path, 'a', encoding='utf-8')
+        self.files[path] = f
+        while len(self.files) > self.max_open:
+            self.files.popitem(last=False)[1].close()
+        return f
+
+    def emit(self, record):
+        try:
+            f = self._file(getattr(record, 'test_id', None))
+            f.write(self.format(record) + '\n')
+            # Flushed per record so a test's log is complete as soon as the listener has caught up
+            f.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
+        super().close()
+
+
+_listener = None
+_lock = threading.Lock()
+
+
+def start_test_logging(root=LOG_ROOT, level=logging.INFO):
+    """Route this process's test records through a queue to a background thread writing per-test files
+
+    Every process (the runner and each worker) runs its own listener; a test
+    only ever logs from the process running it, so no file has two writers.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+        records = queue.SimpleQueue()
+        handler = PerTestFileHandler(root)
+        handler.setFormatter(FieldsFormatter(LOG_FORMAT))
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.handlers = [QueueHandler(records)]
+        logger.setLevel(level)
+        logger.propagate = False
+        _listener = QueueListener(records, handler)
+        _listener.start()
+        return _listener
+
+
+def stop_test_logging():
+    """Write out everything still queued and close the log files"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        logging.getLogger(LOGGER_NAME).handlers = []
+        _listener = None
+
+
+def get_test_logger(test_id):
+    """The logger for one test's records; cheap to call per test"""
+    return TestLogger(logging.getLogger(LOGGER_NAME), {'test_id': test_id})
@@ -0,0 +1,85 @@
+import io
+import contextlib
+import multiprocessing
+from multiprocessing import util as mp_util
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+
+def capture_output(func, *args):
+    """Run func and return (return value, everything it printed) so worker logs never interleave"""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+        value = func(*args)
+    return value, buffer.getvalue()
+
+
+def register_worker_cleanup(cleanup):
+    """Run cleanup when a pool worker exits (atexit handlers do not fire in multiprocessing children)"""
+    mp_util.Finalize(None, cleanup, exitpriority=10)
+
+
+def _crashed(test_case, e):
+    print(f"❌ FAILED: Worker crashed: {e}")
+    return {
+        'id': test_case['id'],
+        'title': test_case['title'],
+        'module': test_case.get('module', 'N/A'),
+        'status': 'FAILED',
+        'error': f"Worker crashed: {e}",
+        # Same category as other browser/process failures (see retry_policy.py), so --retry-on
+        # and the flake history treat it alike
+        'failure_category': 'infrastructure',
+    }
+
+
+def run_in_workers(test_cases, worker_fn, workers, initializer=None, initargs=(), on_result=None):
+    """Spread test cases across a process pool and return results in the original order
+
+    worker_fn(test_case) must return (result, output). Each test's output is
+    printed as one block when it completes, and on_result(result) is called
+    in completion order. Only as many tests as there are workers are handed
+    out at a time, so when a worker dies and breaks the pool just the tests
+    it was running fail; the rest go to a fresh pool.
+    """
+    results = [None] * len(test_cases)
+    total = len(test_cases)
+    done = 0
+    queue = deque(range(total))
+    ctx = multiprocessing.get_context('spawn')
+    while queue:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=initializer, initargs=initargs) as executor:
+            running = {}
+            broken = False
+            while queue or running:
+                while queue and len(running) < workers and not broken:
+                    i = queue.popleft()
+                    try:
+                        running[executor.submit(worker_fn, test_cases[i])] = i
+                    except BrokenProcessPool:
+                        queue.appendleft(i)
+                        broken = True
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = running.pop(future)
+                    test_case = test_cases[i]
+                    done += 1
+                    print(f"\n[{done}/{total}] {test_case['id']}: {test_case['title']}")
+                    try:
+                        result, output = future.result()
+                        print(output, end='')
+                    except BrokenProcessPool as e:
+                        # A worker died (e.g. killed by OOM): every test the pool was running fails with it
+                        broken = True
+                        result = _crashed(test_case, e)
+                    except Exception as e:
+                        result = _crashed(test_case, e)
+                    results[i] = result
+                    if on_result:
+                        on_result(result)
+        if queue:
+            print(f"⚠️  Worker pool broke; restarting it for the {len(queue)} remaining test cases")
+    return results
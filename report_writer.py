@@ -0,0 +1,208 @@
+import os
+from html import escape
+from datetime import datetime
+
+from timings import format_phases
+from retry_policy import flake_rate
+
+REPORT_FILE = os.path.join('artifacts', 'report.html')
+PAGE_SIZE = 100
+REFRESH_SECONDS = 5
+
+HEADER = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Universal Test Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        h1 { color: #333; }
+        .summary { background: #f5f5f5; padding: 15px; border-radius: 5px; margin: 20px 0; }
+        .summary span { margin-right: 20px; font-weight: bold; }
+        .passed { color: green; }
+        .failed { color: red; }
+        .running, .flaky { color: #b36b00; }
+        .controls input, .controls select, .controls button { margin-right: 8px; padding: 4px; }
+        table { width: 100%%; border-collapse: collapse; margin: 20px 0; }
+        th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
+        th { background-color: #4CAF50; color: white; }
+        tr:nth-child(even) { background-color: #f2f2f2; }
+        .status-passed { background-color: #d4edda; }
+        .status-failed { background-color: #f8d7da; }
+        .phases { color: #666; font-size: 0.85em; }
+        a { color: #007bff; text-decoration: none; }
+        a:hover { text-decoration: underline; }
+    </style>
+    <script>
+    // Rows are appended while the run is going; everything below works on whatever rows exist so far
+    const PAGE_SIZE = %(page_size)d;
+    let page = 0;
+    function matching() {
+        const text = document.getElementById('filter').value.toLowerCase();
+        const status = document.getElementById('status').value;
+        return Array.from(document.querySelectorAll('#results tr[data-status]')).filter(row =>
+            (!status || row.dataset.status === status || (status === 'FLAKY' && row.dataset.flaky)) && (!text || row.textContent.toLowerCase().includes(text)));
+    }
+    function render() {
+        const rows = document.querySelectorAll('#results tr[data-status]');
+        const shown = new Set(matching());
+        const pages = Math.max(1, Math.ceil(shown.size / PAGE_SIZE));
+        page = Math.min(page, pages - 1);
+        let index = 0, passed = 0, failed = 0, flaky = 0;
+        rows.forEach(row => {
+            if (row.dataset.status === 'PASSED') passed++; else failed++;
+            if (row.dataset.flaky) flaky++;
+            const visible = shown.has(row) && Math.floor(index / PAGE_SIZE) === page;
+            if (shown.has(row)) index++;
+            row.hidden = !visible;
+        });
+        const total = passed + failed;
+        document.getElementById('total').textContent = total;
+        document.getElementById('passed').textContent = passed;
+        document.getElementById('failed').textContent = failed;
+        document.getElementById('flaky').textContent = flaky;
+        document.getElementById('rate').textContent = total ? (passed / total * 100).toFixed(1) + '%%' : 'n/a';
+        document.getElementById('page').textContent = `Page ${page + 1} of ${pages} (${shown.size} matching)`;
+    }
+    document.addEventListener('DOMContentLoaded', () => {
+        document.getElementById('filter').oninput = () => { page = 0; render(); };
+        document.getElementById('status').onchange = () => { page = 0; render(); };
+        document.getElementById('prev').onclick = () => { page = Math.max(0, page - 1); render(); };
+        document.getElementById('next').onclick = () => { page++; render(); };
+        render();
+        if (!document.getElementById('report-complete')) {
+            document.getElementById('progress').hidden = false;
+            setTimeout(() => location.reload(), %(refresh_ms)d);
+        }
+    });
+    </script>
+</head>
+<body>
+    <h1>Universal Test Report</h1>
+    <div class="summary">
+        <span>Total: <span id="total"></span></span>
+        <span class="passed">Passed: <span id="passed"></span></span>
+        <span class="failed">Failed: <span id="failed"></span></span>
+        <span class="flaky">Flaky: <span id="flaky"></span></span>
+        <span>Pass Rate: <span id="rate"></span></span>
+        <span>Started: %(started)s</span>
+        <span class="running" id="progress" hidden>Run in progress, refreshing every %(refresh)ds</span>
+    </div>
+    <div class="controls">
+        <input id="filter" placeholder="Filter by id, title, module or error">
+        <select id="status"><option value="">All</option><option value="PASSED">Passed</option><option value="FAILED">Failed</option><option value="FLAKY">Flaky</option></select>
+        <button id="prev">Previous</button><button id="next">Next</button>
+        <span id="page"></span>
+    </div>
+    <table id="results">
+        <tr>
+            <th>Test ID</th>
+            <th>Module</th>
+            <th>Title</th>
+            <th>Status</th>
+            <th>Duration</th>
+            <th>Artifacts</th>
+        </tr>
+"""
+
+
+class StreamingReport:
+    """artifacts/report.html written a row at a time as results arrive
+
+    The file is flushed after every row, so a partial report survives a crash
+    or a CI timeout and can be opened while the run is going (it reloads
+    itself until finish() writes the completion marker). Counts and phase
+    totals are kept as rows are added; filtering and pagination happen in the
+    browser.
+    """
+
+    def __init__(self, path=REPORT_FILE, flakes=None, timings_file=None):
+        self.path = path
+        # Results name their artifact folder relative to the report's folder (see artifact_store.py)
+        self.root = os.path.dirname(path)
+        # This run's timings.jsonl, linked from the footer; merged reports span several runs and have none
+        self.timings_link = os.path.relpath(timings_file, self.root or '.').replace(os.sep, '/') if timings_file else None
+        # Per-test flake history from earlier runs (see retry_policy.py)
+        self.flakes = flakes or {}
+        self.passed = 0
+        self.failed = 0
+        self.phases = {}
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write(HEADER % {
+            'page_size': PAGE_SIZE,
+            'refresh': REFRESH_SECONDS,
+            'refresh_ms': REFRESH_SECONDS * 1000,
+            'started': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        self.file.flush()
+
+    @property
+    def total(self):
+        return self.passed + self.failed
+
+    def add(self, result):
+        if result['status'] == 'PASSED':
+            self.passed += 1
+        else:
+            self.failed += 1
+        timings = result.get('timings', {})
+        for name, ms in timings.get('phases', {}).items():
+            self.phases[name] = self.phases.get(name, 0.0) + ms
+
+        test_id = escape(result['id'])
+        status_class = 'status-passed' if result['status'] == 'PASSED' else 'status-failed'
+        status = escape(result['status']) + (' (unchanged, not rerun)' if result.get('cached') else '')
+        if result.get('failure_category'):
+            status += f" ({escape(result['failure_category'])})"
+        attempts = len(result.get('attempts', []))
+        if result.get('flaky'):
+            status += f' <span class="flaky">flaky, passed on attempt {attempts}</span>'
+        elif attempts > 1:
+            status += f' after {attempts} attempts'
+        flaky_runs, runs = flake_rate(self.flakes, result)
+        if flaky_runs:
+            status += f'<div class="phases">flake rate {flaky_runs / runs * 100:.0f}% ({flaky_runs}/{runs} runs)</div>'
+        duration = f"{timings['duration_ms'] / 1000:.2f}s" if timings else 'N/A'
+        error = f'<div class="phases">{escape(result["error"])}</div>' if result.get('error') else ''
+        flaky_attr = ' data-flaky="1"' if result.get('flaky') else ''
+        self.file.write(f"""        <tr class="{status_class}" data-status="{escape(result['status'])}"{flaky_attr}>
+            <td>{test_id}</td>
+            <td>{escape(str(result.get('module', 'N/A')))}</td>
+            <td>{escape(result['title'])}</td>
+            <td>{status}{error}</td>
+            <td>{duration}<div class="phases">{format_phases(timings.get('phases', {}))}</div></td>
+            <td>{self._artifact_links(result)}</td>
+        </tr>
+""")
+        self.file.flush()
+
+    def _artifact_links(self, result):
+        # Results from before run folders existed only have the test id
+        folder = result.get('artifacts') or result['id']
+        local = os.path.join(self.root, *folder.split('/'))
+        if not os.path.isdir(local):
+            run_dir = os.path.dirname(local)
+            if os.path.exists(run_dir + '.zip'):
+                return f'Packed (--unpack-run {escape(os.path.basename(run_dir))})'
+            if result.get('cached'):
+                return 'Not kept'
+        href = escape(folder)
+        links = (f'<a href="{href}/screenshots/" target="_blank">Screenshots</a> |\n'
+                 f'                <a href="{href}/videos/" target="_blank">Videos</a> |\n'
+                 f'                <a href="{href}/test.log" target="_blank">Log</a>')
+        if os.path.exists(os.path.join(local, 'trace.zip')):
+            links += f' | <a href="{href}/trace.zip" target="_blank">Trace</a>'
+        return links
+
+    def finish(self):
+        """Close the table and write the completion marker that stops the page reloading"""
+        timings_link = f' (<a href="{escape(self.timings_link)}" target="_blank">timings.jsonl</a>)' if self.timings_link else ''
+        self.file.write(f"""    </table>
+    <div class="summary phases" id="report-complete">
+        Finished: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")} |
+        Time by phase: {format_phases(self.phases) or 'n/a'}{timings_link}
+    </div>
+</body>
+</html>
+""")
+        self.file.close()
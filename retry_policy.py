@@ -0,0 +1,136 @@
+import os
+import re
+import json
+import time
+
+from sharding import HISTORY_DIR
+
+FLAKES_FILE = os.path.join(HISTORY_DIR, 'flakes.json')
+CATEGORIES = ('infrastructure', 'timeout', 'assertion')
+DEFAULT_RETRY_ON = ('infrastructure', 'timeout')
+
+# Messages that mean the test itself decided the outcome; a rerun would fail the same way
+ASSERTION_MARKERS = ('Test validation failed', 'Unsupported steps in test plan', 'No locator ')
+TIMEOUT_MARKERS = ('Timeout', 'timeout', 'exceeded')
+VALIDATION_PREFIX = 'Test validation failed: '
+# Each inputMatrix variant's errors read "[email='a', password=''] <error>" (see input_matrix.py)
+VARIANT_ERROR = re.compile(r"\[.*?\] (.*?)(?:; (?=\[)|$)")
+
+
+def _timed_out(error):
+    return any(marker in error for marker in TIMEOUT_MARKERS)
+
+
+def classify_failure(error):
+    """'assertion', 'timeout' or 'infrastructure' (browser, network and anything unexpected)"""
+    error = error or ''
+    if error.startswith(VALIDATION_PREFIX):
+        # A variant whose steps raised is listed among the validation errors; when every listed error
+        # is such a timeout the test did not decide anything, so it is classified as one
+        inner = VARIANT_ERROR.findall(error[len(VALIDATION_PREFIX):])
+        return 'timeout' if inner and all(_timed_out(part) for part in inner) else 'assertion'
+    if any(marker in error for marker in ASSERTION_MARKERS):
+        return 'assertion'
+    # Playwright's TimeoutError messages read "Timeout 5000ms exceeded"
+    if _timed_out(error):
+        return 'timeout'
+    return 'infrastructure'
+
+
+class RetryPolicy:
+    """How often a failed test is rerun (each attempt in a fresh context) and for which failure categories"""
+
+    def __init__(self, retries=0, retry_on=DEFAULT_RETRY_ON):
+        for category in retry_on:
+            if category not in CATEGORIES:
+                raise ValueError(f"Invalid retry category '{category}', expected one of {', '.join(CATEGORIES)}")
+        self.retries = retries
+        self.retry_on = tuple(retry_on)
+
+    def __repr__(self):
+        return f"RetryPolicy(retries={self.retries}, retry_on={self.retry_on})"
+
+    def should_retry(self, result, attempt):
+        """attempt is 1-based: the number of runs made so far"""
+        return result['status'] == 'FAILED' and attempt <= self.retries and result['failure_category'] in self.retry_on
+
+
+def _summarize(result, attempts):
+    """The last attempt's result plus the history of the attempts before it"""
+    result['attempts'] = attempts
+    if len(attempts) > 1:
+        # Passed after failing: the earlier failures are what made it flaky
+        result['flaky'] = result['status'] == 'PASSED'
+    return result
+
+
+def _attempt_entry(result):
+    entry = {'status': result['status']}
+    if result['status'] == 'FAILED':
+        entry['error'] = result.get('error')
+        entry['failure_category'] = result['failure_category']
+    return entry
+
+
+def run_with_retries(run_attempt, policy):
+    """Call run_attempt(attempt) until it passes or the policy stops retrying; returns the final result"""
+    attempts = []
+    attempt = 1
+    while True:
+        result = run_attempt(attempt)
+        attempts.append(_attempt_entry(result))
+        if not policy.should_retry(result, attempt):
+            return _summarize(result, attempts)
+        print(f"🔁 Retrying {result['id']} ({result['failure_category']} failure, attempt {attempt + 1} of {policy.retries + 1})")
+        attempt += 1
+
+
+async def run_with_retries_async(run_attempt, policy):
+    """Async counterpart of run_with_retries"""
+    attempts = []
+    attempt = 1
+    while True:
+        result = await run_attempt(attempt)
+        attempts.append(_attempt_entry(result))
+        if not policy.should_retry(result, attempt):
+            return _summarize(result, attempts)
+        print(f"🔁 Retrying {result['id']} ({result['failure_category']} failure, attempt {attempt + 1} of {policy.retries + 1})")
+        attempt += 1
+
+
+def load_flakes(path=FLAKES_FILE):
+    """{test_id: {'runs', 'flaky', 'failed', 'last_flaky'}} from earlier runs"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def flake_rate(flakes, result):
+    """(flaky runs, runs) for a test including this result, unless it was not rerun"""
+    entry = flakes.get(result['id'], {})
+    if result.get('cached'):
+        return entry.get('flaky', 0), entry.get('runs', 0)
+    return entry.get('flaky', 0) + bool(result.get('flaky')), entry.get('runs', 0) + 1
+
+
+def update_flakes(results, path=FLAKES_FILE):
+    """Count this run's results into the per-test flake history (tests not rerun are left alone)"""
+    flakes = load_flakes(path)
+    for result in results:
+        if result.get('cached'):
+            continue
+        entry = flakes.setdefault(result['id'], {'runs': 0, 'flaky': 0, 'failed': 0, 'last_flaky': None})
+        entry['runs'] += 1
+        if result.get('flaky'):
+            entry['flaky'] += 1
+            entry['last_flaky'] = round(time.time())
+        elif result['status'] == 'FAILED':
+            entry['failed'] += 1
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(flakes, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return flakes
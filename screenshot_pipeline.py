@@ -0,0 +1,148 @@
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SCREENSHOT_FORMATS = ('png', 'jpeg')
+CLIP_MODES = ('page', 'element')
+ELEMENT_PADDING = 16  # pixels kept around the element in element screenshots
+WRITER_THREADS = 2
+
+# Readies the page for a screenshot in one round trip: fall back to system fonts instead of waiting for
+# web fonts, then let two frames pass so the last DOM change is painted
+STABILIZE_JS = """async () => {
+    document.fonts.clear();
+    document.body.style.fontFamily = 'Arial, sans-serif';
+    document.fonts.ready = Promise.resolve();
+    await new Promise(r => requestAnimationFrame(() => requestAnimationFrame(() => r())));
+}"""
+
+
+class ScreenshotOptions:
+    """Image format and quality of step screenshots, and whether they show the page or just the element acted on"""
+
+    def __init__(self, format='png', quality=None, clip='page'):
+        if format not in SCREENSHOT_FORMATS:
+            raise ValueError(f"Invalid screenshot format '{format}', expected one of {', '.join(SCREENSHOT_FORMATS)}")
+        if clip not in CLIP_MODES:
+            raise ValueError(f"Invalid screenshot clip '{clip}', expected one of {', '.join(CLIP_MODES)}")
+        if quality is not None and (format != 'jpeg' or not 0 <= quality <= 100):
+            raise ValueError("Screenshot quality is a number from 0 to 100 and only applies to jpeg")
+        self.format = format
+        self.quality = quality
+        self.clip = clip
+
+    def __repr__(self):
+        return f"ScreenshotOptions(format={self.format}, quality={self.quality}, clip={self.clip})"
+
+    def screenshot_kwargs(self):
+        """Arguments for page.screenshot; the browser does the encoding"""
+        kwargs = {'type': self.format}
+        if self.quality is not None:
+            kwargs['quality'] = self.quality
+        return kwargs
+
+    def filename(self, name):
+        """name with the extension of the chosen format"""
+        return name if self.format == 'png' else os.path.splitext(name)[0] + '.jpg'
+
+
+def element_clip(box, viewport, padding=ELEMENT_PADDING):
+    """A clip rectangle around a bounding box, kept inside the viewport; None to capture the whole page"""
+    if not box or not viewport:
+        return None
+    x = max(0, box['x'] - padding)
+    y = max(0, box['y'] - padding)
+    width = min(box['x'] + box['width'] + padding, viewport['width']) - x
+    height = min(box['y'] + box['height'] + padding, viewport['height']) - y
+    if width <= 0 or height <= 0:
+        return None
+    return {'x': x, 'y': y, 'width': width, 'height': height}
+
+
+class ScreenshotWriter:
+    """Writes screenshots from background threads so tests only wait for the capture
+
+    Frames are content-addressed: a frame identical to one already written
+    in this run is hard-linked to it instead of being written again.
+    """
+
+    def __init__(self, threads=WRITER_THREADS):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='screenshot-writer')
+        self.futures = []
+        self.written = {}  # sha256 -> first path written with that content
+        self.contents = {}  # path -> sha256 of what it holds now
+        self.lock = threading.Lock()
+        self.stats = {'frames': 0, 'duplicates': 0, 'bytes_written': 0, 'errors': 0}
+
+    def submit(self, path, data):
+        with self.lock:
+            self.futures = [f for f in self.futures if not f.done()]
+            self.futures.append(self.executor.submit(self._write, path, data))
+
+    def _write(self, path, data):
+        digest = hashlib.sha256(data).hexdigest()
+        with self.lock:
+            self.stats['frames'] += 1
+            original = self.written.get(digest)
+            # The first copy may since have been replaced by a different frame of the same name
+            if original is None or self.contents.get(original) != digest:
+                original = self.written[digest] = path
+        # Written under a temporary name and moved into place, so replacing a file never
+        # changes the content of other names linked to it
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            linked = False
+            if original != path:
+                try:
+                    os.link(original, tmp_path)
+                    linked = True
+                except OSError:
+                    pass  # not written yet, or no hard links on this filesystem: write the bytes
+            if not linked:
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+            os.replace(tmp_path, path)
+            with self.lock:
+                self.contents[path] = digest
+                if linked:
+                    self.stats['duplicates'] += 1
+                else:
+                    self.stats['bytes_written'] += len(data)
+        except OSError as e:
+            with self.lock:
+                self.stats['errors'] += 1
+            print(f"Screenshot write failed: {os.path.basename(path)} - {str(e)}")
+
+    def flush(self):
+        """Wait for every queued frame to be on disk"""
+        with self.lock:
+            futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+
+    def close(self):
+        self.flush()
+        self.executor.shutdown(wait=True)
+
+
+_writer = None
+
+
+def get_screenshot_writer():
+    """This process's writer, created on first use"""
+    global _writer
+    if _writer is None:
+        _writer = ScreenshotWriter()
+    return _writer
+
+
+def close_screenshot_writer():
+    """Finish pending writes; returns the writer's stats (None if nothing was ever written)"""
+    global _writer
+    if _writer is None:
+        return None
+    _writer.close()
+    stats, _writer = _writer.stats, None
+    return stats
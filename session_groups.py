@@ -0,0 +1,87 @@
+from urllib.parse import urlparse
+
+from compiled_plan import TestPlan
+from input_matrix import RESET_FORMS_JS, STATE_JS
+
+# A test case can declare "sharedSetup": N, the number of its leading steps (the opening goto included)
+# that only bring the page into the state the case starts from. Cases whose setup steps compile to the
+# same actions form a group: the setup runs once in one page and every case starts from a reset of that
+# state instead of a new context, a goto and the setup clicks.
+
+
+def setup_length(test_case):
+    return int(test_case.get('sharedSetup') or 0)
+
+
+def setup_key(plan, count):
+    """The setup's actions, ignoring step descriptions; None if the plan cannot share its setup"""
+    steps = plan.steps
+    if count < 1 or len(steps) <= count or steps[0].kind != 'goto' or steps[count].kind == 'goto' or plan.errors:
+        return None
+    if any(step.is_assertion for step in steps[:count]):
+        return None
+    return tuple((step.kind, step.value, step.wait_phase) + ((step.target.by, step.target.value, step.target.name) if step.target else ())
+                 for step in steps[:count])
+
+
+def split_plan(plan, count):
+    """(setup plan, plan of the case's own steps)"""
+    return (TestPlan(plan.test_id, plan.steps[:count], [], plan.variant),
+            TestPlan(plan.test_id, plan.steps[count:], list(plan.errors), plan.variant))
+
+
+def group_by_setup(test_cases, plan_of, shareable=lambda test_case: True):
+    """Units of work in run order: lists of two or more cases sharing a setup, or single cases
+
+    A group runs where its first member would have run.
+    """
+    units, groups = [], {}
+    for test_case in test_cases:
+        key = None
+        if setup_length(test_case) and shareable(test_case):
+            key = setup_key(plan_of(test_case), setup_length(test_case))
+        if key is None:
+            units.append([test_case])
+        elif key in groups:
+            groups[key].append(test_case)
+        else:
+            groups[key] = [test_case]
+            units.append(groups[key])
+    return units
+
+
+class SharedSession:
+    """A page brought into a group's setup state once and reset back to it between cases"""
+
+    def __init__(self, page, url, setup_plan, run_steps, timeout=5000):
+        self.page = page
+        self.url = url
+        self.setup_plan = setup_plan
+        # run_steps(plan) executes a plan's steps after its opening goto in this page
+        self.run_steps = run_steps
+        self.timeout = timeout
+        self.state = None
+        self.used = False
+
+    def start(self):
+        self.page.goto(self.url, timeout=self.timeout)
+        self.page.wait_for_load_state('domcontentloaded', timeout=self.timeout)
+        self.run_steps(self.setup_plan)
+        self.state = self.page.evaluate(STATE_JS)
+
+    def reset(self):
+        """Bring the page back to the setup state; False if it cannot be reached without a fresh context"""
+        if not self.used:
+            self.used = True
+            return self.page.evaluate(STATE_JS) == self.state
+        if urlparse(self.page.url).path != urlparse(self.url).path:
+            self.page.goto(self.url, timeout=self.timeout)
+            self.page.wait_for_load_state('domcontentloaded', timeout=self.timeout)
+            self.run_steps(self.setup_plan)
+        else:
+            self.page.evaluate(RESET_FORMS_JS)
+            if self.page.evaluate(STATE_JS) == self.state:
+                return True
+            # e.g. the case closed the modal the setup opened: replay the setup's steps in place
+            self.run_steps(self.setup_plan)
+        return self.page.evaluate(STATE_JS) == self.state
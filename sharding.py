@@ -0,0 +1,98 @@
+import os
+import glob
+import heapq
+import json
+import statistics
+
+HISTORY_DIR = '.test_history'
+DURATIONS_FILE = os.path.join(HISTORY_DIR, 'durations.json')
+DEFAULT_DURATION_MS = 10000.0  # assumed for tests with no history when nothing else is known
+SMOOTHING = 0.5  # weight of the newest run in the stored duration
+
+
+def parse_shard(value):
+    """'2/4' -> (2, 4); shards are numbered from 1"""
+    try:
+        index, total = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N such as 1/4")
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"Invalid shard '{value}': i must be between 1 and N")
+    return index, total
+
+
+def load_durations(path=DURATIONS_FILE):
+    """{test_id: duration_ms} recorded by earlier runs"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def update_durations(results, path=DURATIONS_FILE):
+    """Fold this run's per-test durations into the history (a moving average, so one slow run doesn't dominate)"""
+    durations = load_durations(path)
+    for result in results:
+        duration = result.get('timings', {}).get('duration_ms')
+        if duration is None:
+            continue
+        previous = durations.get(result['id'])
+        durations[result['id']] = round(duration if previous is None else SMOOTHING * duration + (1 - SMOOTHING) * previous, 1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return durations
+
+
+def estimate(test_case, durations, fallback):
+    return durations.get(test_case['id'], fallback)
+
+
+def partition(test_cases, total, durations):
+    """Split test cases into `total` shards of similar expected duration (longest processing time first)
+
+    Tests without history are assumed to take the median known duration. The
+    result is deterministic for a given history, so every CI job computes the
+    same split independently.
+    """
+    fallback = statistics.median(durations.values()) if durations else DEFAULT_DURATION_MS
+    ordered = sorted(test_cases, key=lambda tc: (-estimate(tc, durations, fallback), tc['id']))
+    shards = [[] for _ in range(total)]
+    loads = [(0.0, i) for i in range(total)]
+    for test_case in ordered:
+        load, i = heapq.heappop(loads)
+        shards[i].append(test_case)
+        heapq.heappush(loads, (load + estimate(test_case, durations, fallback), i))
+    # Run each shard in the original (file) order
+    position = {tc['id']: n for n, tc in enumerate(test_cases)}
+    return [sorted(shard, key=lambda tc: position[tc['id']]) for shard in shards]
+
+
+def select_shard(test_cases, index, total, durations):
+    """The test cases shard `index` of `total` should run, plus its estimated duration in ms"""
+    shard = partition(test_cases, total, durations)[index - 1]
+    fallback = statistics.median(durations.values()) if durations else DEFAULT_DURATION_MS
+    return shard, sum(estimate(tc, durations, fallback) for tc in shard)
+
+
+def shard_results_path(index, total, artifacts_dir='artifacts'):
+    return os.path.join(artifacts_dir, f"results-shard-{index}-of-{total}.json")
+
+
+def save_results(results, path, shard=None):
+    with open(path, 'w') as f:
+        json.dump({'shard': shard, 'results': results}, f, indent=2)
+
+
+def merge_results(paths=None, artifacts_dir='artifacts'):
+    """Combine per-shard result files (all of artifacts/results-shard-*.json by default) in test id order"""
+    paths = paths or sorted(glob.glob(os.path.join(artifacts_dir, 'results-shard-*.json')))
+    merged = {}
+    for path in paths:
+        with open(path, 'r') as f:
+            for result in json.load(f)['results']:
+                merged[result['id']] = result
+    return [merged[test_id] for test_id in sorted(merged)], paths
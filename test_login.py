@@ -9,41 +9,77 @@ def generate_universal_test_script():
     script_content = '''import os
 import sys
 import json
-import logging
 import shutil
-import importlib
-from datetime import datetime
-from playwright.sync_api import sync_playwright
+from urllib.parse import urlparse
 
 # Add parent directory to path for imports
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
 
-def setup_artifacts():
-    if os.path.exists('artifacts'):
-        shutil.rmtree('artifacts')
-    os.makedirs('artifacts', exist_ok=True)
+from browser_pool import get_browser_pool, close_browser_pool, print_pool_stats, merge_pool_stats
+from parallel_runner import run_in_workers, capture_output, register_worker_cleanup
+from async_engine import run_tests_async
+from wait_strategies import WaitRecorder, plan_wait, snapshot_wait, wait_for, log_waits
+from artifact_policy import CapturePolicy, CaptureSession, CAPTURE_MODES, attempt_folder
+from auth_state import StorageStateCache, DEFAULT_TTL, AUTH_STATE_DIR, requires_auth, ensure_storage_state, session_expired, invalidate_session, get_credentials
+from local_server import LocalAppServer, retarget_url, DEFAULT_USERS
+from asset_cache import get_asset_cache, install_routes, RouteStats, BLOCK_MODES
+from timings import PhaseTimer, format_phases, set_timings_file, TIMINGS_FILENAME
+from report_writer import StreamingReport
+from sharding import parse_shard, select_shard, load_durations, update_durations, shard_results_path, save_results, merge_results
+from incremental import fingerprint, load_history, full_run_due, select_changed, cached_result, record_results, DEFAULT_FULL_RUN_HOURS
+from locator_registry import get_locator_registry, LocatorError
+from locator_check import check_modules, print_locator_report, save_locator_report
+from input_matrix import run_variants
+from batch_assertions import visibility_batches, check_visible_batch
+from screenshot_pipeline import ScreenshotOptions, SCREENSHOT_FORMATS, CLIP_MODES, STABILIZE_JS, element_clip, get_screenshot_writer, close_screenshot_writer
+from log_queue import get_test_logger, start_test_logging, stop_test_logging
+from artifact_store import ARTIFACTS_DIR, RUNS_DIR, RetentionPolicy, DEFAULT_KEEP_RUNS, DEFAULT_MAX_GB, start_run, finish_run, start_maintenance, unpack_run
+from session_groups import SharedSession, group_by_setup, setup_length, split_plan
+from retry_policy import RetryPolicy, CATEGORIES, DEFAULT_RETRY_ON, classify_failure, run_with_retries, load_flakes, update_flakes
+from load_mode import SCENARIOS, build_scenarios, run_load, save_load_summary, print_load_summary
+from compiled_plan import load_or_compile_plans, compile_test_case, compile_variants, variant_plans, retarget_plan, report_plan_errors, resolve_target, screenshot_name, assertion_error
+
+def setup_artifacts(retention=None):
+    """Create the artifacts folder and start packing and pruning earlier runs in the background; returns that thread"""
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    return start_maintenance(retention)
+
+def use_run_dir(run_dir):
+    """Point this process's test folders, logs and timings at a run's folder"""
+    globals()['run_dir'] = run_dir
+    set_timings_file(os.path.join(run_dir, TIMINGS_FILENAME))
+    start_test_logging(run_dir)
+
+def artifacts_folder(test_id):
+    return os.path.join(globals().get('run_dir', ARTIFACTS_DIR), test_id)
 
-def setup_test_artifacts(test_id):
-    test_folder = os.path.join('artifacts', test_id)
+def setup_test_artifacts(test_id, policy=None):
+    """Create the test's artifact folders; on-failure folders are created only when something is written"""
+    policy = policy or CapturePolicy(video='always', screenshots='always')
+    test_folder = artifacts_folder(test_id)
     screenshots_folder = os.path.join(test_folder, 'screenshots')
     videos_folder = os.path.join(test_folder, 'videos')
-    os.makedirs(screenshots_folder, exist_ok=True)
-    os.makedirs(videos_folder, exist_ok=True)
+    os.makedirs(test_folder, exist_ok=True)
+    if policy.screenshots == 'always':
+        os.makedirs(screenshots_folder, exist_ok=True)
+    if policy.video == 'always':
+        os.makedirs(videos_folder, exist_ok=True)
     return test_folder, screenshots_folder, videos_folder
 
-def safe_screenshot(page, path):
+def safe_screenshot(page, options=None, target=None):
+    """Capture the page, or the area around target when options clip to elements; returns the image bytes"""
+    options = options or ScreenshotOptions()
     try:
         if not page.is_closed():
-            # Disable font loading to prevent timeouts
-            page.evaluate(\"document.fonts.clear(); document.body.style.fontFamily = 'Arial, sans-serif';\")
-            page.evaluate(\"document.fonts.ready = Promise.resolve();\")
-            page.wait_for_timeout(100)
-            page.screenshot(path=path, animations='disabled')
-            print(f\"Screenshot: {os.path.basename(path)}\")
-            return
+            # Web fonts disabled to prevent timeouts, and the next paint awaited, in one round trip
+            page.evaluate(STABILIZE_JS)
+            clip = None
+            if target is not None and options.clip == 'element' and target.count() == 1:
+                clip = element_clip(target.bounding_box(), page.viewport_size)
+            return page.screenshot(animations='disabled', clip=clip, **options.screenshot_kwargs())
     except Exception as e:
-        print(f\"Screenshot failed: {os.path.basename(path)} - {str(e)}\")
+        print(f"Screenshot failed: {str(e)}")
 
 
 def load_all_testcases():
@@ -62,6 +98,10 @@ def load_all_testcases():
                 with open(filepath, 'r') as f:
                     data = json.load(f)
                     if 'testCases' in data:
+                        plans = load_or_compile_plans(filepath, data)
+                        for test_case in data['testCases']:
+                            test_case['plan'] = plans[test_case['id']]
+                            test_case['variants'] = variant_plans(plans, test_case['id'])
                         all_testcases.extend(data['testCases'])
                     print(f"Loaded {len(data.get('testCases', []))} test cases from {filename}")
             except Exception as e:
@@ -70,288 +110,413 @@ def load_all_testcases():
     return all_testcases
 
 def get_module_url(module_name):
-    """Get URL for module from config/urls.py"""
-    try:
-        from config import urls
-        url_map = {
-            'login': getattr(urls, 'LOGIN_URL', 'https://dev.vox.snappod.ai/login'),
-            'signup': getattr(urls, 'SIGNUP_URL', 'https://dev.vox.snappod.ai/signup'),
-            'dashboard': getattr(urls, 'DASHBOARD_URL', 'https://dev.vox.snappod.ai/dashboard'),
-        }
-        return url_map.get(module_name.lower(), 'https://dev.vox.snappod.ai/login')
-    except:
-        return 'https://dev.vox.snappod.ai/login'
+    """Get URL for module from config/urls.py (loaded once, see locator_registry.py)"""
+    url = get_locator_registry().url(module_name)
+    # --target local points every module at the stand-in app server
+    return retarget_url(url, globals().get('target_base_url'))
 
 def get_module_locators(module_name):
-    """Dynamically import locators for module"""
+    """Locators for module, loaded once and checked against the names the runner uses"""
+    return get_locator_registry().locators(module_name)
+
+ASSERTION_TIMEOUT = 3000
+
+def check_assertion(page, step):
+    """Check one compiled assertion step; returns an error message or None"""
+    actual = None
     try:
-        module_path = f'config.{module_name.lower()}_locators'
-        locators_module = importlib.import_module(module_path)
-        return locators_module
-    except:
-        # Fallback to login locators
-        class DefaultLocators:
-            enter_your_email_input = "#login-email"
-            enter_your_password_input = "#login-password"
-            login_button = "button:has-text('Login')"
-            forgot_password_a = "a:has-text('Forgot Password')"
-        return DefaultLocators()
+        if step.kind == 'expect_url':
+            actual = page.url
+            page.wait_for_url(lambda url: step.matcher.matches(url), timeout=ASSERTION_TIMEOUT)
+            return None
+        locator = resolve_target(page, step.target).first
+        if step.kind == 'expect_visible':
+            locator.wait_for(state='visible', timeout=ASSERTION_TIMEOUT)
+            return None
+        if step.kind == 'expect_hidden':
+            locator.wait_for(state='hidden', timeout=ASSERTION_TIMEOUT)
+            return None
+        if step.kind == 'expect_property':
+            actual = locator.evaluate("(el, name) => el[name]", step.attribute)
+        else:
+            actual = locator.get_attribute(step.attribute, timeout=ASSERTION_TIMEOUT)
+        if step.matcher.matches(actual):
+            return None
+    except Exception:
+        if step.kind == 'expect_url':
+            actual = page.url
+    return assertion_error(step, actual)
 
-def validate_expected_outcomes(page, test_case):
-    """Validate expected outcomes and return test result"""
-    expected = test_case.get('expected', [])
-    function_name = test_case.get('function', '').lower()
-    inputs = test_case.get('inputs', {})
-    
+def execute_test_steps(page, test_case, capture, locators, waits=None, plan=None, timer=None):
+    """Execute the test case's compiled plan and return failed assertions"""
+    plan = plan or test_case.get('plan') or compile_test_case(test_case)
+    waits = waits if waits is not None else WaitRecorder()
+    timer = timer or PhaseTimer(test_case['id'], path=None)
     validation_errors = []
-    
-    try:
-        # Check for successful login/signup
-        if 'successful' in function_name:
-            if 'login' in function_name:
-                if '/dashboard' not in page.url:
-                    validation_errors.append(f"Expected redirect to dashboard, but URL is: {page.url}")
-            elif 'signup' in function_name:
-                if '/dashboard' not in page.url and 'success' not in page.url.lower():
-                    validation_errors.append(f"Expected redirect to dashboard or success page, but URL is: {page.url}")
+    step_counter = 1
+    batches = visibility_batches(plan.steps)
+    batched = {start + n for start, steps in batches.items() for n in range(len(steps))}
+    
+    for index, step in enumerate(plan.steps):
+        if step.kind == 'goto':
+            # run_test has already navigated to the module URL for the opening goto
+            if index > 0:
+                with timer.phase('goto', url=step.value):
+                    page.goto(step.value, timeout=5000)
+            continue
         
-        # Check for validation errors on invalid inputs
-        elif 'invalid' in function_name or 'empty' in function_name:
-            expected_url = inputs.get('url', '')
-            if expected_url and expected_url not in page.url:
-                validation_errors.append(f"Expected to stay on {expected_url}, but URL is: {page.url}")
+        if index in batches:
+            # Consecutive visibility checks run together, sharing one deadline (see batch_assertions.py)
+            with timer.phase('assertion', step=index, description=f"{len(batches[index])} visibility checks"):
+                validation_errors.extend(check_visible_batch(page, batches[index], ASSERTION_TIMEOUT))
+            continue
+        if index in batched:
+            continue
         
-        # Check element visibility tests
-        elif 'visibility' in function_name or 'elements' in function_name:
-            steps = test_case.get('steps', [])
-            for step in steps:
-                if 'expect(' in step and 'toBeVisible()' in step:
-                    if 'getByAltText' in step:
-                        alt_text = step.split("getByAltText('")[1].split("')")[0]
-                        try:
-                            page.locator(f'img[alt="{alt_text}"]').wait_for(timeout=800)
-                        except:
-                            validation_errors.append(f"Element with alt text '{alt_text}' not visible")
-                    elif 'getByRole' in step:
-                        if 'heading' in step:
-                            heading_text = step.split("name: '")[1].split("'")[0]
-                            try:
-                                page.locator(f'h1:has-text("{heading_text}"), h2:has-text("{heading_text}"), h3:has-text("{heading_text}")').wait_for(timeout=800)
-                            except:
-                                validation_errors.append(f"Heading '{heading_text}' not visible")
-                        elif 'button' in step:
-                            button_text = step.split("name: '")[1].split("'")[0]
-                            try:
-                                page.locator(f'button:has-text("{button_text}")').wait_for(timeout=1500)
-                            except:
-                                validation_errors.append(f"Button '{button_text}' not visible")
+        if step.is_assertion:
+            with timer.phase('assertion', step=index, description=step.description):
+                error = check_assertion(page, step)
+            if error:
+                validation_errors.append(error)
+            continue
         
-        # Check navigation tests
-        elif 'navigate' in function_name:
-            expected_url = inputs.get('expectedSignUpUrl') or inputs.get('expectedUrl')
-            if expected_url and expected_url not in page.url:
-                validation_errors.append(f"Expected navigation to {expected_url}, but URL is: {page.url}")
+        start_url = page.url
+        locator = resolve_target(page, step.target)
+        wait = None
+        if step.wait_phase:
+            # Planned before the step, so its outcome is told apart from what the page showed already
+            wait = plan_wait(test_case, step.wait_phase, locators, start_url)
+            with timer.phase('wait', step=index, wait_phase=step.wait_phase, snapshot=True):
+                snapshot_wait(page, wait)
+        with timer.phase('step', step=index, kind=step.kind, description=step.description):
+            if step.kind == 'fill':
+                locator.fill(step.value)
+            else:
+                locator.click()
         
-    except Exception as e:
-        validation_errors.append(f"Validation error: {str(e)}")
+        if wait:
+            with timer.phase('wait', step=index, wait_phase=step.wait_phase):
+                wait_for(page, wait, waits)
+        name = screenshot_name(step_counter, step, plan)
+        with timer.phase('screenshot', name=name):
+            capture.screenshot(page, name, locator)
+        step_counter += 1
     
     return validation_errors
 
-def execute_test_steps(page, test_case, screenshots_folder, locators):
-    """Execute test steps based on test case data"""
-    inputs = test_case.get('inputs', {})
-    module = test_case.get('module', 'login').lower()
-    
-    # Handle different input field names
-    email_data = inputs.get('emailData') or inputs.get('validEmail') or inputs.get('email')
-    password_data = inputs.get('passwordData') or inputs.get('validPassword') or inputs.get('password')
-    
-    step_counter = 1
-    
-    # Fill email if present
-    if email_data:
-        try:
-            page.locator(locators.enter_your_email_input).fill(email_data)
-            safe_screenshot(page, os.path.join(screenshots_folder, f'step_{step_counter:02d}_email_filled.png'))
-            step_counter += 1
-        except Exception as e:
-            print(f"Email fill failed: {e}")
-    
-    # Fill password if present
-    if password_data:
-        try:
-            page.locator(locators.enter_your_password_input).fill(password_data)
-            safe_screenshot(page, os.path.join(screenshots_folder, f'step_{step_counter:02d}_password_filled.png'))
-            step_counter += 1
-        except Exception as e:
-            print(f"Password fill failed: {e}")
+def get_module_name(test_case):
+    """Extract module name from module field"""
+    # 'Sign Up Page' and 'Signup' both name the signup module
+    module = test_case.get('module', 'Login Page').lower().replace(' ', '')
+    if 'login' in module:
+        return 'login'
+    elif 'signup' in module:
+        return 'signup'
+    elif 'dashboard' in module:
+        return 'dashboard'
+    return 'login'  # default
+
+def build_context_options(capture):
+    options = {
+        'ignore_https_errors': True,
+        'extra_http_headers': {'Accept-Language': 'en-US,en;q=0.9'}
+    }
+    options.update(capture.context_options())
+    return options
+
+def prepare_test(test_case):
+    """Resolve artifacts folders, URL and locators for a test before any browser work"""
+    plan = test_case.get('plan') or compile_test_case(test_case)
+    variants = test_case['variants'] if 'variants' in test_case else compile_variants(test_case)
+    errors = plan.errors + [error for variant in variants for error in variant.errors]
+    if errors:
+        raise Exception(f"Unsupported steps in test plan: {'; '.join(errors)}")
+    target_base_url = globals().get('target_base_url')
+    if target_base_url:
+        plan = retarget_plan(plan, lambda url: retarget_url(url, target_base_url))
+        variants = [retarget_plan(variant, lambda url: retarget_url(url, target_base_url)) for variant in variants]
+    module_name = get_module_name(test_case)
+    policy = globals().get('capture_policy') or CapturePolicy()
+    test_folder, screenshots_folder, videos_folder = setup_test_artifacts(test_case['id'], policy)
+    url = get_module_url(module_name)
+    return {
+        'module_name': module_name,
+        'test_folder': test_folder,
+        'screenshots_folder': screenshots_folder,
+        'videos_folder': videos_folder,
+        'url': url,
+        'locators': get_module_locators(module_name),
+        'policy': policy,
+        # Screenshots are captured on the test's thread and written by a background pool (see screenshot_pipeline.py)
+        'screenshot_options': globals().get('screenshot_options') or ScreenshotOptions(),
+        'screenshot_writer': get_screenshot_writer(),
+        'plan': plan,
+        # inputMatrix variants run back to back in this test's page (see input_matrix.py)
+        'variants': variants,
+        'matrix_reset': test_case.get('matrixReset', 'form'),
+        # Authenticated tests start from a cached login session (see auth_state.py)
+        'auth_cache': StorageStateCache(ttl=globals().get('auth_ttl', DEFAULT_TTL)) if requires_auth(test_case) else None,
+        'login_url': get_module_url('login'),
+        'login_locators': get_module_locators('login'),
+        # Static assets served from a per-process cache, analytics/third-party optionally blocked (see asset_cache.py)
+        'asset_cache': get_asset_cache(globals().get('asset_cache_mode', 'memory')),
+        'block_mode': globals().get('block_mode', 'none'),
+        'first_party_host': urlparse(url).hostname or '',
+    }
+
+def run_test(test_case, timer=None, attempt=1):
+    """Run individual test case; a retry (attempt > 1) records its video apart from earlier attempts"""
+    test_id = test_case['id']
+    timer = timer or PhaseTimer(test_id)
+    prepared = prepare_test(test_case)
+    module_name = prepared['module_name']
+    test_folder = prepared['test_folder']
+    url = prepared['url']
+    locators = prepared['locators']
+    # Records go through a queue to {run folder}/{test_id}/test.log (see log_queue.py)
+    logger = get_test_logger(test_id)
+    
+    headless_mode = globals().get('headless_mode', False)
+    recycle_after = globals().get('recycle_after', 0)
+    pool = get_browser_pool(headless=headless_mode, recycle_after=recycle_after)
+    capture = CaptureSession(prepared['policy'], prepared['screenshots_folder'], attempt_folder(prepared['videos_folder'], attempt), safe_screenshot,
+                             trace_path=os.path.join(test_folder, 'trace.zip'),
+                             options=prepared['screenshot_options'], writer=prepared['screenshot_writer'])
+    context_options = build_context_options(capture)
+    if prepared['auth_cache']:
+        with timer.phase('auth'):
+            context_options['storage_state'] = ensure_storage_state(pool, prepared['auth_cache'], prepared['login_url'], prepared['login_locators'])
+    launches = len(pool.launch_times)
+    context = pool.new_context(**context_options)
+    # The pool times its own (re)launches and context creation; launch only shows up for the test that paid for it
+    for seconds in pool.launch_times[launches:]:
+        timer.add('launch', seconds * 1000)
+    timer.add('context', pool.context_times[-1] * 1000)
+    network = RouteStats()
+    if prepared['asset_cache'] or prepared['block_mode'] != 'none':
+        install_routes(context, prepared['asset_cache'], network, prepared['block_mode'], prepared['first_party_host'])
+    capture.start_tracing(context)
+    page = context.new_page()
+    waits = WaitRecorder()
+    failed = False
     
-    # Click main action button based on module
     try:
-        if 'login' in module:
-            page.locator(locators.login_button).click()
-        elif 'signup' in module:
-            page.locator(getattr(locators, 'signup_button', 'button:has-text("Sign Up")')).click()
+        logger.info(f"Running test: {test_case['title']}")
+        logger.info(f"Module: {module_name}, URL: {url}")
+        
+        # Navigate to page
+        with timer.phase('goto', url=url):
+            page.goto(url, timeout=5000)
+            page.wait_for_load_state('domcontentloaded', timeout=1500)
+        with timer.phase('screenshot', name='00_initial.png'):
+            capture.screenshot(page, '00_initial.png')
+        
+        # Execute test steps and their assertions, once per inputMatrix variant if it has any
+        if prepared['variants']:
+            validation_errors = run_variants(page, prepared['variants'], page.url,
+                                             lambda plan: execute_test_steps(page, test_case, capture, locators, waits, plan, timer),
+                                             prepared['matrix_reset'],
+                                             # The ring buffer only holds the last few frames: write a failed variant's out before the next one runs
+                                             on_failure=lambda plan: capture.flush_frames())
         else:
-            page.locator('button[type="submit"]').click()
+            validation_errors = execute_test_steps(page, test_case, capture, locators, waits, prepared['plan'], timer)
+        if validation_errors:
+            raise Exception(f"Test validation failed: {'; '.join(validation_errors)}")
         
-        safe_screenshot(page, os.path.join(screenshots_folder, f'step_{step_counter:02d}_button_clicked.png'))
-        step_counter += 1
+        # Final screenshot
+        with timer.phase('screenshot', name='99_final.png'):
+            capture.screenshot(page, '99_final.png')
         
-        # Wait and capture result
-        page.wait_for_timeout(800)
-        safe_screenshot(page, os.path.join(screenshots_folder, f'step_{step_counter:02d}_result.png'))
+        logger.info(f"Test {test_id} completed successfully")
         
     except Exception as e:
-        print(f"Button click failed: {e}")
-    
-    # Handle special actions
-    function_name = test_case.get('function', '').lower()
-    
-    if 'forgotpassword' in function_name:
+        logger.error(f"Test {test_id} failed: {str(e)}")
+        failed = True
+        with timer.phase('screenshot', name='error.png'):
+            capture.screenshot(page, 'error.png')
+        if prepared['auth_cache'] and session_expired(page, prepared['login_url']):
+            logger.warning("Session expired; cached login state invalidated")
+            invalidate_session(prepared['auth_cache'], prepared['login_url'])
+        if not pool.is_healthy():
+            pool.mark_crashed()
+        raise e
+    finally:
+        log_waits(logger, waits)
+        waits.save(os.path.join(test_folder, 'waits.json'))
+        logger.info(f"Network: {network.requests} requests, {network.cache_hits} served from cache, {network.blocked} blocked, {network.bytes_fetched} bytes fetched")
+        network.save(os.path.join(test_folder, 'network.json'))
         try:
-            page.locator(locators.forgot_password_a).click()
-            page.wait_for_timeout(500)
-            safe_screenshot(page, os.path.join(screenshots_folder, f'step_{step_counter:02d}_forgot_password.png'))
+            with timer.phase('teardown'):
+                capture.stop_tracing(context, failed)
+                context.close()
         except Exception as e:
-            print(f"Forgot password failed: {e}")
-    
-    elif 'google' in function_name:
+            logger.error(f"Context close failed: {str(e)}")
+            pool.mark_crashed()
+        capture.finish(failed)
+        logger.info(f"Timings: {format_phases(timer.totals)}")
+
+def build_result(test_case, status, error=None, timer=None):
+    result = {
+        'id': test_case['id'],
+        'title': test_case['title'],
+        'module': test_case.get('module', 'N/A'),
+        'status': status,
+        # Relative to artifacts/, so reports built later (merged shards, cached rows) still find the run's folder
+        'artifacts': os.path.relpath(artifacts_folder(test_case['id']), ARTIFACTS_DIR).replace(os.sep, '/'),
+    }
+    if error:
+        result['error'] = error
+    if status == 'FAILED':
+        result['failure_category'] = classify_failure(error)
+    if timer:
+        result['timings'] = timer.summary()
+    return result
+
+def run_test_case(test_case):
+    """Run a test case and return its result instead of raising, rerunning failures the retry policy allows"""
+    def attempt(number):
+        timer = PhaseTimer(test_case['id'])
         try:
-            page.locator('button:has-text("Google")').click()
-            page.wait_for_timeout(500)
-            safe_screenshot(page, os.path.join(screenshots_folder, f'step_{step_counter:02d}_google_signin.png'))
+            run_test(test_case, timer, number)
+            print("✅ PASSED" if number == 1 else f"✅ PASSED on attempt {number} (flaky)")
+            return build_result(test_case, 'PASSED', timer=timer)
         except Exception as e:
-            print(f"Google signin failed: {e}")
-
-def run_test(test_case):
-    """Run individual test case"""
-    test_id = test_case['id']
-    module = test_case.get('module', 'Login Page').lower()
-    
-    # Extract module name from module field
-    if 'login' in module:
-        module_name = 'login'
-    elif 'signup' in module:
-        module_name = 'signup'
-    else:
-        module_name = 'login'  # default
-    
-    test_folder, screenshots_folder, videos_folder = setup_test_artifacts(test_id)
+            print(f"❌ FAILED: {str(e)}")
+            return build_result(test_case, 'FAILED', str(e), timer=timer)
     
-    # Setup logging
-    log_file = os.path.join(test_folder, 'test.log')
-    logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    logger = logging.getLogger(test_id)
+    return run_with_retries(attempt, globals().get('retry_policy') or RetryPolicy())
+
+def run_in_session(test_case, session, timer):
+    """Run a grouped test case's own steps from the group's shared page; raises like run_test
     
-    # Get module-specific URL and locators
-    url = get_module_url(module_name)
-    locators = get_module_locators(module_name)
-    
-    with sync_playwright() as p:
-        headless_mode = globals().get('headless_mode', False)
-        browser = p.chromium.launch(headless=headless_mode, args=['--disable-web-security', '--disable-features=VizDisplayCompositor', '--no-sandbox', '--disable-dev-shm-usage'])
-        context = browser.new_context(
-            record_video_dir=videos_folder,
-            record_video_size={"width": 1280, "height": 720},
-            ignore_https_errors=True,
-            extra_http_headers={'Accept-Language': 'en-US,en;q=0.9'}
-        )
-        page = context.new_page()
-        
+    The reset only checks that the page's DOM signature matches the one after
+    setup; cookies and storage left behind by earlier cases are not compared.
+    Screenshots go to shared_screenshots/, apart from a fresh-context rerun's.
+    """
+    test_id = test_case['id']
+    prepared = prepare_test(test_case)
+    logger = get_test_logger(test_id)
+    screenshots_folder = os.path.join(prepared['test_folder'], 'shared_screenshots')
+    if prepared['policy'].screenshots == 'always':
+        os.makedirs(screenshots_folder, exist_ok=True)
+    capture = CaptureSession(prepared['policy'], screenshots_folder, prepared['videos_folder'], safe_screenshot,
+                             options=prepared['screenshot_options'], writer=prepared['screenshot_writer'])
+    _, own_plan = split_plan(prepared['plan'], setup_length(test_case))
+    page = session.page
+    waits = WaitRecorder()
+    failed = False
+    try:
+        logger.info(f"Running test: {test_case['title']} (shared setup)")
+        with timer.phase('reset'):
+            if not session.reset():
+                raise Exception("Page did not return to the shared setup state")
+        with timer.phase('screenshot', name='00_initial.png'):
+            capture.screenshot(page, '00_initial.png')
+        validation_errors = execute_test_steps(page, test_case, capture, prepared['locators'], waits, own_plan, timer)
+        if validation_errors:
+            raise Exception(f"Test validation failed: {'; '.join(validation_errors)}")
+        with timer.phase('screenshot', name='99_final.png'):
+            capture.screenshot(page, '99_final.png')
+        logger.info(f"Test {test_id} completed successfully")
+    except Exception as e:
+        logger.error(f"Test {test_id} failed in the shared page: {str(e)}")
+        failed = True
+        raise
+    finally:
+        log_waits(logger, waits)
+        waits.save(os.path.join(prepared['test_folder'], 'waits.json'))
+        # The shared page records no video, so this only keeps or drops the frames
+        capture.finish(failed)
+
+def run_group(group, on_result=None):
+    """Run test cases that declare the same setup in one page: the setup once, then a reset per case
+    
+    A case that finds the page in another state, or fails, is rerun on its own in a fresh context.
+    """
+    prepared = prepare_test(group[0])
+    setup_plan, _ = split_plan(prepared['plan'], setup_length(group[0]))
+    pool = get_browser_pool(headless=globals().get('headless_mode', False), recycle_after=globals().get('recycle_after', 0))
+    no_capture = CaptureSession(CapturePolicy(video='off', screenshots='off'), None, None, None)
+    context = None
+    results = []
+    try:
         try:
-            logger.info(f"Running test: {test_case['title']}")
-            logger.info(f"Module: {module_name}, URL: {url}")
-            
-            # Navigate to page
-            page.goto(url, timeout=5000)
-            page.wait_for_load_state('domcontentloaded', timeout=1500)
-            safe_screenshot(page, os.path.join(screenshots_folder, '00_initial.png'))
-            
-            # Execute test steps
-            execute_test_steps(page, test_case, screenshots_folder, locators)
-            
-            # Validate expected outcomes
-            validation_errors = validate_expected_outcomes(page, test_case)
-            if validation_errors:
-                raise Exception(f"Test validation failed: {'; '.join(validation_errors)}")
-            
-            # Final screenshot
-            safe_screenshot(page, os.path.join(screenshots_folder, '99_final.png'))
-            
-            logger.info(f"Test {test_id} completed successfully")
-            
+            context = pool.new_context(**build_context_options(no_capture))
+            if prepared['asset_cache'] or prepared['block_mode'] != 'none':
+                install_routes(context, prepared['asset_cache'], RouteStats(), prepared['block_mode'], prepared['first_party_host'])
+            page = context.new_page()
+            session = SharedSession(page, prepared['url'], setup_plan,
+                                    lambda plan: execute_test_steps(page, group[0], no_capture, prepared['locators'], plan=plan))
+            session.start()
+            print(f"🧷 Shared setup ({len(setup_plan.steps)} steps) for {', '.join(tc['id'] for tc in group)}")
         except Exception as e:
-            logger.error(f"Test {test_id} failed: {str(e)}")
-            safe_screenshot(page, os.path.join(screenshots_folder, 'error.png'))
-            raise e
-        finally:
-            context.close()
-            browser.close()
+            print(f"⚠️  Shared setup failed, running the group's cases individually: {str(e)}")
+            session = None
+            if not pool.is_healthy():
+                pool.mark_crashed()
+        for test_case in group:
+            print(f"\\n▶ {test_case['id']}: {test_case['title']}")
+            result = None
+            if session:
+                # Tagged so a failed shared attempt isn't summed with the rerun under the same test id
+                timer = PhaseTimer(test_case['id'], shared_setup=True)
+                try:
+                    run_in_session(test_case, session, timer)
+                    print("✅ PASSED (shared setup)")
+                    result = build_result(test_case, 'PASSED', timer=timer)
+                    result['shared_setup'] = True
+                except Exception as e:
+                    print(f"🔁 {str(e)}; rerunning in a fresh context")
+            if result is None:
+                result = run_test_case(test_case)
+            results.append(result)
+            if on_result:
+                on_result(result)
+    finally:
+        if context:
+            try:
+                context.close()
+            except Exception:
+                pool.mark_crashed()
+    return results
+
+def init_worker(options):
+    """Process pool initializer: apply CLI options and close the worker's browser on exit"""
+    globals().update(options)
+    use_run_dir(options['run_dir'])
+    register_worker_cleanup(close_browser_pool)
+    register_worker_cleanup(close_screenshot_writer)
+    register_worker_cleanup(stop_test_logging)
+
+def run_test_case_in_worker(test_case):
+    """Worker entry point: returns the result plus the test's buffered output"""
+    result, output = capture_output(run_test_case, test_case)
+    result['worker'] = os.getpid()
+    result['pool_stats'] = get_browser_pool().stats()
+    return result, output
 
 def generate_html_report(results):
-    """Generate HTML report"""
+    """Generate HTML report from a finished list of results (e.g. merged shards)"""
+    report = StreamingReport(flakes=load_flakes())
+    for result in results:
+        report.add(result)
+    report.finish()
+
+def print_summary(results):
     passed = sum(1 for r in results if r['status'] == 'PASSED')
     failed = sum(1 for r in results if r['status'] == 'FAILED')
-    total = len(results)
-    
-    html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>Universal Test Report</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; }}
-        h1 {{ color: #333; }}
-        .summary {{ background: #f5f5f5; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-        .summary span {{ margin-right: 20px; font-weight: bold; }}
-        .passed {{ color: green; }}
-        .failed {{ color: red; }}
-        table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-        th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-        th {{ background-color: #4CAF50; color: white; }}
-        tr:nth-child(even) {{ background-color: #f2f2f2; }}
-        .status-passed {{ background-color: #d4edda; }}
-        .status-failed {{ background-color: #f8d7da; }}
-        a {{ color: #007bff; text-decoration: none; }}
-        a:hover {{ text-decoration: underline; }}
-    </style>
-</head>
-<body>
-    <h1>Universal Test Report</h1>
-    <div class="summary">
-        <span>Total: {total}</span>
-        <span class="passed">Passed: {passed}</span>
-        <span class="failed">Failed: {failed}</span>
-        <span>Pass Rate: {(passed/total*100):.1f}%</span>
-        <span>Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</span>
-    </div>
-    <table>
-        <tr>
-            <th>Test ID</th>
-            <th>Module</th>
-            <th>Title</th>
-            <th>Status</th>
-            <th>Artifacts</th>
-        </tr>"""
+    flaky = [r for r in results if r.get('flaky')]
     
-    for result in results:
-        status_class = 'status-passed' if result['status'] == 'PASSED' else 'status-failed'
-        html += f"""        <tr class="{status_class}">
-            <td>{result['id']}</td>
-            <td>{result.get('module', 'N/A')}</td>
-            <td>{result['title']}</td>
-            <td>{result['status']}</td>
-            <td><a href="{result['id']}/screenshots/" target="_blank">Screenshots</a> | 
-                <a href="{result['id']}/videos/" target="_blank">Videos</a> | 
-                <a href="{result['id']}/test.log" target="_blank">Log</a></td>
-        </tr>"""
-    
-    html += """    </table>
-</body>
-</html>"""
-    
-    with open('artifacts/report.html', 'w') as f:
-        f.write(html)
+    print(f"\\n📊 Test Summary:")
+    print(f"   Total: {len(results)}")
+    print(f"   Passed: {passed}")
+    print(f"   Failed: {failed}")
+    print(f"   Pass Rate: {(passed/len(results)*100):.1f}%")
+    if failed:
+        by_category = {category: sum(1 for r in results if r.get('failure_category') == category) for category in CATEGORIES}
+        print(f"   Failures: {', '.join(f'{count} {category}' for category, count in by_category.items() if count)}")
+    if flaky:
+        print(f"   Flaky (passed on retry): {', '.join(r['id'] for r in flaky)}")
 
 if __name__ == '__main__':
     import argparse
@@ -360,14 +525,113 @@ if __name__ == '__main__':
     parser.add_argument('--test', '-t', help='Run specific test case', default=None)
     parser.add_argument('--module', '-m', help='Run tests for specific module (login, signup, etc.)', default=None)
     parser.add_argument('--headless', help='Run in headless mode (no browser window)', action='store_true')
+    parser.add_argument('--recycle-after', help='Restart the shared browser after N tests (0 = never)', type=int, default=0)
+    parser.add_argument('--workers', '-w', help='Number of worker processes to spread test cases across', type=int, default=1)
+    parser.add_argument('--engine', help='Execution engine: sync (one test at a time per process) or async (concurrent tasks)', choices=['sync', 'async'], default='sync')
+    parser.add_argument('--concurrency', help='Max concurrent test cases for the async engine', type=int, default=8)
+    parser.add_argument('--browsers', help='Browsers shared by the async engine', type=int, default=1)
+    parser.add_argument('--video', help='When to keep video recordings (default: on-failure, or off when tracing)', choices=CAPTURE_MODES, default=None)
+    parser.add_argument('--screenshots', help='When to keep step screenshots (default: on-failure, or off when tracing)', choices=CAPTURE_MODES, default=None)
+    parser.add_argument('--target', help='remote: the configured URLs; local: the bundled stand-in app (no network needed)', choices=['remote', 'local'], default='remote')
+    parser.add_argument('--auth-ttl', help='Seconds a cached login session is reused by authenticated tests', type=int, default=DEFAULT_TTL)
+    parser.add_argument('--clear-auth', help='Discard cached login sessions before running', action='store_true')
+    parser.add_argument('--asset-cache', help='Serve static assets (scripts, styles, fonts, images) from a cache shared by tests: memory, disk (persists in .asset_cache/) or off',
+                        choices=['memory', 'disk', 'off'], default='memory')
+    parser.add_argument('--block', help='Abort analytics requests, or every third-party subresource, to speed up page loads',
+                        choices=BLOCK_MODES, default='none')
+    parser.add_argument('--screenshot-format', help='Image format of screenshots (encoded by the browser)', choices=SCREENSHOT_FORMATS, default='png')
+    parser.add_argument('--screenshot-quality', help='JPEG quality, 0-100', type=int, default=None)
+    parser.add_argument('--screenshot-clip', help='Capture the whole viewport, or only the element a step acted on', choices=CLIP_MODES, default='page')
+    parser.add_argument('--trace', help='Record a Playwright trace per test into artifacts/runs/{run_id}/{test_id}/trace.zip (--trace alone keeps it on failure)',
+                        choices=CAPTURE_MODES, nargs='?', const='on-failure', default='off')
+    parser.add_argument('--changed-only', help='Skip test cases that passed last time and whose JSON, locators and URL are unchanged',
+                        action='store_true')
+    parser.add_argument('--full-run-every', help='Hours after which --changed-only runs everything anyway', type=float, default=DEFAULT_FULL_RUN_HOURS)
+    parser.add_argument('--check-locators', help="Open each module's page once, resolve every selector in its locator file and exit (1 if any are missing)",
+                        action='store_true')
+    parser.add_argument('--shard', help='Run only shard i of N (e.g. 2/4), balanced by durations from earlier runs', default=None)
+    parser.add_argument('--merge-results', help='Combine per-shard results (default: artifacts/results-shard-*.json) into artifacts/report.html and exit',
+                        nargs='*', metavar='FILE', default=None)
+    parser.add_argument('--no-shared-setup', help='Run every test case in its own context, even those declaring a sharedSetup',
+                        action='store_true')
+    parser.add_argument('--retries', help='Rerun a failed test up to N more times in a fresh context', type=int, default=0)
+    parser.add_argument('--retry-on', help='Failure categories that are retried', choices=CATEGORIES, nargs='+', default=list(DEFAULT_RETRY_ON))
+    parser.add_argument('--load', help='Load mode: drive N concurrent virtual users through the --scenario flows instead of running the tests',
+                        type=int, metavar='USERS', default=0)
+    parser.add_argument('--scenario', help='Flows the virtual users cycle through in load mode', choices=list(SCENARIOS), nargs='+', default=['login'])
+    parser.add_argument('--ramp-up', help='Seconds over which load mode starts its virtual users', type=float, default=0.0)
+    parser.add_argument('--duration', help='Seconds load mode keeps starting new sessions (including the ramp-up)', type=float, default=60.0)
+    parser.add_argument('--keep-runs', help='Packed earlier runs kept in artifacts/runs', type=int, default=DEFAULT_KEEP_RUNS)
+    parser.add_argument('--max-artifacts-gb', help='Disk the packed earlier runs may use; the oldest are deleted first', type=float, default=DEFAULT_MAX_GB)
+    parser.add_argument('--unpack-run', help='Restore a packed run (artifacts/runs/RUN_ID.zip) into its folder and exit', metavar='RUN_ID', default=None)
     args = parser.parse_args()
     
-    # Set global headless mode
-    globals()['headless_mode'] = args.headless
+    if args.merge_results is not None:
+        results, shard_files = merge_results(args.merge_results)
+        if not results:
+            print("❌ No shard results found!")
+            exit(1)
+        print(f"🧩 Merged {len(results)} results from {len(shard_files)} shard file(s)")
+        update_durations(results)
+        generate_html_report(results)
+        update_flakes(results)
+        print_summary(results)
+        print(f"\\n📄 HTML Report: artifacts/report.html")
+        exit(0)
+    
+    if args.unpack_run:
+        archive = os.path.join(RUNS_DIR, f"{args.unpack_run}.zip")
+        if not os.path.exists(archive):
+            print(f"❌ No packed run {args.unpack_run} in {RUNS_DIR}")
+            exit(1)
+        print(f"📦 Unpacked into {unpack_run(archive)} (removed again when the next run cleans up)")
+        exit(0)
+    
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"❌ {e}")
+            exit(1)
+    
+    # A trace already holds per-action screenshots and DOM snapshots, so it replaces them by default
+    artifact_default = 'off' if args.trace != 'off' else 'on-failure'
+    
+    try:
+        screenshot_options = ScreenshotOptions(args.screenshot_format, args.screenshot_quality, args.screenshot_clip)
+        retention = RetentionPolicy(args.keep_runs, args.max_artifacts_gb)
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+    
+    # Options every worker process needs (workers don't share this module's globals)
+    runner_options = {
+        'headless_mode': args.headless,
+        'recycle_after': args.recycle_after,
+        'auth_ttl': args.auth_ttl,
+        'asset_cache_mode': args.asset_cache,
+        'block_mode': args.block,
+        'retry_policy': RetryPolicy(args.retries, args.retry_on),
+        'screenshot_options': screenshot_options,
+        'capture_policy': CapturePolicy(video=args.video or artifact_default,
+                                        screenshots=args.screenshots or artifact_default,
+                                        trace=args.trace),
+    }
+    
+    app_server = None
+    if args.target == 'local':
+        app_server = LocalAppServer().start()
+        runner_options['target_base_url'] = app_server.base_url
+        print(f"🏠 Using local stand-in app at {app_server.base_url}")
+    globals().update(runner_options)
     
     print("🚀 Universal Test Runner Starting...")
     
-    setup_artifacts()
+    # No cleanup up front: earlier runs are packed and pruned while this one runs (see artifact_store.py)
+    maintenance = setup_artifacts(retention)
+    if args.clear_auth and os.path.exists(AUTH_STATE_DIR):
+        shutil.rmtree(AUTH_STATE_DIR)
     all_testcases = load_all_testcases()
     
     if not all_testcases:
@@ -375,6 +639,17 @@ if __name__ == '__main__':
         exit(1)
     
     print(f"📋 Found {len(all_testcases)} total test cases")
+    broken_plans = report_plan_errors([tc['plan'] for tc in all_testcases])
+    if broken_plans:
+        print(f"⚠️  {broken_plans} test case(s) use unsupported step syntax and will fail without running")
+    
+    # Resolve every module's locators up front so a bad mapping stops the run before any browser starts
+    try:
+        for module_name in sorted({get_module_name(tc) for tc in all_testcases}):
+            get_module_locators(module_name)
+    except LocatorError as e:
+        print(f"❌ {e}")
+        exit(1)
     
     # Filter test cases
     test_cases_to_run = all_testcases
@@ -390,41 +665,149 @@ if __name__ == '__main__':
         test_cases_to_run = [tc for tc in test_cases_to_run if args.module.lower() in tc.get('module', '').lower()]
         print(f"🔍 Filtered to {len(test_cases_to_run)} test cases for module: {args.module}")
     
-    results = []
-    
-    for i, test_case in enumerate(test_cases_to_run, 1):
-        print(f"\\n[{i}/{len(test_cases_to_run)}] Running {test_case['id']}: {test_case['title']}")
+    if args.check_locators:
+        modules = sorted({get_module_name(tc) for tc in test_cases_to_run})
+        print(f"🔎 Checking locators for: {', '.join(modules)}")
         try:
-            run_test(test_case)
-            results.append({
-                'id': test_case['id'], 
-                'title': test_case['title'], 
-                'module': test_case.get('module', 'N/A'),
-                'status': 'PASSED'
-            })
-            print("✅ PASSED")
-        except Exception as e:
-            results.append({
-                'id': test_case['id'], 
-                'title': test_case['title'], 
-                'module': test_case.get('module', 'N/A'),
-                'status': 'FAILED'
-            })
-            print(f"❌ FAILED: {str(e)}")
-    
-    # Generate report
-    generate_html_report(results)
+            locator_report = check_modules(get_browser_pool(headless=args.headless), modules, get_module_url, get_module_locators)
+        finally:
+            close_browser_pool()
+            if app_server:
+                app_server.stop()
+        save_locator_report(locator_report)
+        blocking = print_locator_report(locator_report)
+        print(f"\\n📄 Locator health: artifacts/locator_health.json")
+        exit(1 if blocking else 0)
+    
+    if args.load:
+        # The login scenario signs in as TEST_USER_EMAIL when set, or as the stand-in app's demo user
+        credentials = get_credentials()
+        if not all(credentials) and app_server:
+            credentials = next(iter(DEFAULT_USERS.items()))
+        try:
+            scenarios = build_scenarios(all_testcases, args.scenario, prepare_test, credentials)
+            print(f"📈 Load: {args.load} virtual users on {', '.join(args.scenario)} for {args.duration:g}s (ramp-up {args.ramp_up:g}s)")
+            load_summary = run_load(scenarios, args.load, args.ramp_up, args.duration, browsers=args.browsers, headless=args.headless)
+        except ValueError as e:
+            print(f"❌ {e}")
+            exit(1)
+        finally:
+            if app_server:
+                app_server.stop()
+        save_load_summary(load_summary)
+        print_load_summary(load_summary)
+        print(f"\\n📄 Load results: artifacts/load.json")
+        exit(0)
+    
+    if shard:
+        test_cases_to_run, estimated_ms = select_shard(test_cases_to_run, shard[0], shard[1], load_durations())
+        print(f"🧩 Shard {shard[0]}/{shard[1]}: {len(test_cases_to_run)} test cases (~{estimated_ms / 1000:.0f}s estimated)")
+        if not test_cases_to_run:
+            save_results([], shard_results_path(*shard), shard=args.shard)
+            print("Nothing to run in this shard")
+            exit(0)
+    
+    # Fingerprints tie each result to the test JSON, locators and URL it ran against (see incremental.py)
+    fingerprints = {}
+    for test_case in test_cases_to_run:
+        module_name = get_module_name(test_case)
+        fingerprints[test_case['id']] = fingerprint(test_case, get_module_locators(module_name), get_module_url(module_name))
+    history = load_history()
+    cached_results = []
+    if args.changed_only:
+        if full_run_due(history, args.full_run_every):
+            print(f"🔁 No full run in the last {args.full_run_every:g}h, running everything")
+        else:
+            test_cases_to_run, unchanged = select_changed(test_cases_to_run, fingerprints, history)
+            cached_results = [cached_result(history, tc['id']) for tc in unchanged]
+            print(f"♻️  Changed only: {len(test_cases_to_run)} to run, {len(unchanged)} unchanged since they last passed")
+    full_run = len(test_cases_to_run) == len(all_testcases)
+    
+    # Everything written per test goes into this run's own folder; test logs are written by a
+    # background thread (workers point themselves at the folder in init_worker)
+    run_dir = start_run()
+    runner_options['run_dir'] = run_dir
+    use_run_dir(run_dir)
+    
+    # The report is written row by row as results come in, so it can be watched mid-run and survives a crash
+    report = StreamingReport(flakes=load_flakes(), timings_file=os.path.join(run_dir, TIMINGS_FILENAME))
+    for result in cached_results:
+        report.add(result)
+    
+    pool_stats = None
+    if not test_cases_to_run:
+        if args.changed_only and cached_results:
+            print("✅ Nothing changed since the last run")
+        else:
+            print("⚠️  No test cases matched the filters")
+        results = []
+    elif args.engine == 'async':
+        print(f"⚙️  Running {len(test_cases_to_run)} test cases on the async engine (concurrency {args.concurrency}, {args.browsers} browser(s))")
+        results = run_tests_async(test_cases_to_run, prepare_test, build_result, build_context_options,
+                                  concurrency=args.concurrency, browsers=args.browsers, headless=args.headless,
+                                  on_result=report.add, retry_policy=runner_options['retry_policy'])
+    elif args.workers > 1:
+        print(f"⚙️  Running {len(test_cases_to_run)} test cases across {args.workers} workers")
+        results = run_in_workers(test_cases_to_run, run_test_case_in_worker, args.workers,
+                                 initializer=init_worker, initargs=(runner_options,), on_result=report.add)
+        pool_stats = merge_pool_stats(results)
+    else:
+        results = []
+        # Cases declaring the same sharedSetup run from one page (see session_groups.py); video or
+        # traces of every test need a context per test
+        policy = runner_options['capture_policy']
+        if args.no_shared_setup or 'always' in (policy.video, policy.trace):
+            units = [[tc] for tc in test_cases_to_run]
+        else:
+            units = group_by_setup(test_cases_to_run, lambda tc: tc['plan'],
+                                   lambda tc: not requires_auth(tc) and not tc.get('inputMatrix'))
+        position = 0
+        for unit in units:
+            if len(unit) > 1:
+                print(f"\\n[{position + 1}-{position + len(unit)}/{len(test_cases_to_run)}] Shared setup group of {len(unit)} test cases")
+                results.extend(run_group(unit, on_result=report.add))
+            else:
+                print(f"\\n[{position + 1}/{len(test_cases_to_run)}] Running {unit[0]['id']}: {unit[0]['title']}")
+                results.append(run_test_case(unit[0]))
+                report.add(results[-1])
+            position += len(unit)
+        pool_stats = get_browser_pool().stats()
+        close_browser_pool()
+    
+    if app_server:
+        app_server.stop()
+    # Workers flush their own screenshot writers when they exit
+    screenshot_stats = close_screenshot_writer()
+    stop_test_logging()
+    
+    # Durations feed --shard balancing on later runs; fingerprints feed --changed-only
+    update_durations(results)
+    record_results(results, fingerprints, history, full_run=full_run)
+    if not shard:
+        # Sharded runs count flakes once, when --merge-results combines the shards
+        update_flakes(results)
+    if cached_results:
+        order = {tc['id']: n for n, tc in enumerate(all_testcases)}
+        results = sorted(results + cached_results, key=lambda r: order.get(r['id'], len(order)))
+    if shard:
+        save_results(results, shard_results_path(*shard), shard=args.shard)
+    
+    # Close the report
+    report.finish()
+    finish_run(run_dir, results)
     
     # Summary
-    passed = sum(1 for r in results if r['status'] == 'PASSED')
-    failed = sum(1 for r in results if r['status'] == 'FAILED')
-    
-    print(f"\\n📊 Test Summary:")
-    print(f"   Total: {len(results)}")
-    print(f"   Passed: {passed}")
-    print(f"   Failed: {failed}")
-    print(f"   Pass Rate: {(passed/len(results)*100):.1f}%")
-    print(f"\\n📄 HTML Report: artifacts/report.html")
+    print_summary(results)
+    if pool_stats:
+        print_pool_stats(pool_stats)
+    if screenshot_stats and screenshot_stats['frames']:
+        print(f"\\n🖼️  Screenshots: {screenshot_stats['frames']} frames, {screenshot_stats['duplicates']} identical to an earlier one and linked instead of written")
+    maintenance.join()
+    if maintenance.stats and (maintenance.stats['packed'] or maintenance.stats['deleted']):
+        stats = maintenance.stats
+        print(f"\\n🗄️  Earlier runs: {stats['packed']} packed, {stats['deleted']} deleted ({stats['freed_bytes'] / 1024 ** 2:.0f} MB freed)")
+    print(f"\\n📁 Run artifacts: {run_dir}")
+    print(f"📄 HTML Report: artifacts/report.html")
 '''
     
     return script_content
@@ -454,6 +837,21 @@ def main():
     print(f"   python {output_file} --test TC-LOGIN-001  # Run specific test")
     print(f"   python {output_file} --module login       # Run all login tests")
     print(f"   python {output_file} --module signup      # Run all signup tests")
+    print(f"   python {output_file} --recycle-after 20   # Restart the shared browser every 20 tests")
+    print(f"   python {output_file} --workers 4          # Spread tests across 4 processes")
+    print(f"   python {output_file} --engine async --concurrency 16  # Run tests as concurrent async tasks")
+    print(f"   python {output_file} --video always --screenshots always  # Keep every artifact, even for passing tests")
+    print(f"   python {output_file} --trace                 # Keep a Playwright trace.zip for failing tests instead of screenshots/video")
+    print(f"   python {output_file} --target local          # Run against the bundled stand-in app (no network)")
+    print(f"   python {output_file} --asset-cache disk --block analytics  # Reuse static assets across runs, skip analytics")
+    print(f"   python {output_file} --shard 2/4              # Run the second of four duration-balanced shards")
+    print(f"   python {output_file} --merge-results          # Combine artifacts/results-shard-*.json into one report")
+    print(f"   python {output_file} --changed-only           # Only rerun cases whose JSON, locators or URL changed, or that failed")
+    print(f"   python {output_file} --check-locators         # Check every selector against its page in one pass, then exit")
+    print(f"   python {output_file} --no-shared-setup       # Give every case its own context, even those declaring a sharedSetup")
+    print(f"   python {output_file} --screenshots always --screenshot-format jpeg --screenshot-quality 70 --screenshot-clip element  # Smaller step screenshots")
+    print(f"   python {output_file} --retries 2              # Rerun infrastructure/timeout failures in a fresh context; flaky tests show in the report")
+    print(f"   python {output_file} --load 20 --ramp-up 10 --duration 60 --scenario login signup --headless  # Load-test the auth flows")
 
 if __name__ == "__main__":
     main()
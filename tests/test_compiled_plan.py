@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+
+import pytest
+
+# The runner's modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compiled_plan
+from compiled_plan import Matcher, PlanError, Step, Target, compile_test_case, compile_variants, load_or_compile_plans, parse_step, screenshot_name
+
+INPUTS = {
+    'url': 'https://example.test/login',
+    'email': 'user@example.test',
+    'emailField': "page.getByLabel('Email')",
+    'welcome': 'Welcome Back!',
+}
+
+
+@pytest.mark.parametrize('step, expected', [
+    ("Open the page: await page.goto(inputs.url)",
+     Step('goto', 'Open the page', value='https://example.test/login')),
+    ("Enter email: await page.locator(inputs.emailField).fill(inputs.email)",
+     Step('fill', 'Enter email', target=Target('label', 'Email'), value='user@example.test')),
+    ("Enter password: await page.getByPlaceholder('Password').fill('secret')",
+     Step('fill', 'Enter password', target=Target('placeholder', 'Password'), value='secret')),
+    ("Fill css: await page.locator('#email').fill(inputs.email)",
+     Step('fill', 'Fill css', target=Target('css', '#email'), value='user@example.test')),
+    ("Click login: await page.getByRole('button', { name: 'Login' }).click()",
+     Step('click', 'Click login', target=Target('role', 'button', 'Login'), wait_phase='after_submit')),
+    ("Open forgot password: await page.getByRole('link', { name: 'Forgot Password' }).click()",
+     Step('click', 'Open forgot password', target=Target('role', 'link', 'Forgot Password'), wait_phase='after_forgot_password')),
+    ("Continue with Google: await page.getByText('Continue with Google').click()",
+     Step('click', 'Continue with Google', target=Target('text', 'Continue with Google'), wait_phase='after_social')),
+    ("Click logo: await page.getByAltText('Logo').click()",
+     Step('click', 'Click logo', target=Target('alt_text', 'Logo'))),
+    ("Wait for dashboard: await page.waitForURL('https://example.test/dashboard')",
+     Step('expect_url', 'Wait for dashboard', matcher=Matcher('exact', 'https://example.test/dashboard'))),
+    ("Check URL: await expect(page).toHaveURL(expect.stringContaining('/dashboard'))",
+     Step('expect_url', 'Check URL', matcher=Matcher('contains', '/dashboard'))),
+    ("Check URL pattern: await expect(page).toHaveURL(/\\/dash\\/board/)",
+     Step('expect_url', 'Check URL pattern', matcher=Matcher('regex', '/dash/board'))),
+    ("Welcome shown: await expect(page.getByText(inputs.welcome)).toBeVisible()",
+     Step('expect_visible', 'Welcome shown', target=Target('text', 'Welcome Back!'))),
+    ("Error hidden: await expect(page.getByLabelText('Error')).not.toBeVisible()",
+     Step('expect_hidden', 'Error hidden', target=Target('label', 'Error'))),
+    ("Email invalid: await expect(page.getByLabel('Email')).toHaveJSProperty('validationMessage', expect.stringContaining('@'))",
+     Step('expect_property', 'Email invalid', target=Target('label', 'Email'), attribute='validationMessage', matcher=Matcher('contains', '@'))),
+    ("Password masked: await expect(page.getByPlaceholderText('Password')).toHaveAttribute('type', 'password')",
+     Step('expect_attribute', 'Password masked', target=Target('placeholder', 'Password'), attribute='type', matcher=Matcher('exact', 'password'))),
+])
+def test_parse_step(step, expected):
+    assert parse_step(step, INPUTS) == expected
+
+
+def test_step_without_description_is_described_by_itself():
+    assert parse_step("await page.goto(inputs.url);", INPUTS).description == "await page.goto(inputs.url);"
+
+
+@pytest.mark.parametrize('step, message', [
+    ("Hover: await page.getByText('Menu').hover()", 'unsupported step syntax'),
+    ("Just a note, nothing to run", 'no executable code'),
+    ("Open: await page.goto(inputs.missing)", 'inputs.missing is not defined'),
+    ("Click: await page.getByTestId('x').click()", 'unsupported locator expression'),
+])
+def test_parse_step_rejects_unsupported_syntax(step, message):
+    with pytest.raises(PlanError, match=message):
+        parse_step(step, INPUTS)
+
+
+def test_compile_test_case_collects_unsupported_steps_as_errors():
+    plan = compile_test_case({
+        'id': 'TC-1',
+        'inputs': INPUTS,
+        'steps': [
+            "Open the page: await page.goto(inputs.url)",
+            "Hover: await page.getByText('Menu').hover()",
+            "Welcome shown: await expect(page.getByText(inputs.welcome)).toBeVisible()",
+        ],
+    })
+    assert plan.test_id == 'TC-1'
+    assert [step.kind for step in plan.steps] == ['goto', 'expect_visible']
+    assert len(plan.errors) == 1 and 'hover()' in plan.errors[0]
+
+
+def test_variant_screenshots_are_named_apart():
+    step = Step('fill', 'Enter email', target=Target('label', 'Email'), value='a@example.test')
+    plans = compile_variants({'id': 'TC-1', 'inputs': INPUTS, 'inputMatrix': {'email': ['a@example.test', 'b@example.test']},
+                              'steps': ["Enter email: await page.locator(inputs.emailField).fill(inputs.email)"]})
+    assert screenshot_name(1, step) == 'step_01_email_filled.png'
+    assert [screenshot_name(1, step, plan) for plan in plans] == ['v1_step_01_email_filled.png', 'v2_step_01_email_filled.png']
+
+
+def test_plan_cache_is_keyed_on_the_compiler_source(tmp_path, monkeypatch):
+    monkeypatch.setattr(compiled_plan, 'PLAN_CACHE_DIR', str(tmp_path / 'cache'))
+    data = {'testCases': [{'id': 'TC-1', 'inputs': INPUTS, 'steps': ["Open the page: await page.goto(inputs.url)"]}]}
+    testcases = tmp_path / 'login_testcases.json'
+    testcases.write_text(json.dumps(data))
+
+    first = load_or_compile_plans(str(testcases), data)
+    assert load_or_compile_plans(str(testcases), data) == first
+    assert len(os.listdir(tmp_path / 'cache')) == 1
+
+    # As if compiled_plan.py or input_matrix.py had been edited
+    monkeypatch.setattr(compiled_plan, '_compiler_digest', 'changed')
+    load_or_compile_plans(str(testcases), data)
+    assert len(os.listdir(tmp_path / 'cache')) == 2
@@ -0,0 +1,86 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from log_queue import LOGGER_NAME
+
+TIMINGS_FILENAME = 'timings.jsonl'
+TIMINGS_FILE = os.path.join('artifacts', TIMINGS_FILENAME)
+# Order phases appear in report breakdowns
+PHASES = ('launch', 'auth', 'context', 'goto', 'reset', 'step', 'wait', 'assertion', 'screenshot', 'teardown')
+
+_write_lock = threading.Lock()
+_log = logging.getLogger(LOGGER_NAME)
+_timings_file = TIMINGS_FILE
+
+
+def set_timings_file(path):
+    """Where timers created without a path write from now on (each run has its own file)"""
+    global _timings_file
+    _timings_file = path
+
+
+class PhaseTimer:
+    """Times the phases of one test, appending each to a JSON Lines file as soon as it ends
+
+    Every line is one phase: {"test_id", "phase", "duration_ms", "ts", ...extra fields}.
+    Without a path the file set by set_timings_file is used; with path=None
+    nothing is written and the timer only keeps totals. Extra keyword
+    arguments tag every line the timer writes.
+    """
+
+    def __init__(self, test_id, path='', **tags):
+        self.test_id = test_id
+        self.path = _timings_file if path == '' else path
+        self.tags = tags
+        self.started = time.perf_counter()
+        self.totals = {}
+
+    def add(self, phase, duration_ms, error=None, **fields):
+        duration_ms = round(duration_ms, 1)
+        self.totals[phase] = round(self.totals.get(phase, 0.0) + duration_ms, 1)
+        if _log.isEnabledFor(logging.INFO):
+            # Also in the test's own log, as structured fields (see log_queue.py)
+            _log.info(f"Phase failed: {error}" if error else "Phase finished",
+                      extra={'test_id': self.test_id, 'phase': phase, 'duration_ms': duration_ms})
+        if not self.path:
+            return
+        entry = {'test_id': self.test_id, 'phase': phase, 'duration_ms': duration_ms, 'ts': round(time.time(), 3)}
+        entry.update(self.tags)
+        entry.update(fields)
+        if error:
+            entry['error'] = error
+        # One write per line in append mode keeps lines whole across threads and worker processes
+        line = json.dumps(entry) + '\n'
+        with _write_lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
+
+    @contextmanager
+    def phase(self, phase, **fields):
+        """Time the body of a with block; also usable around awaits in async code"""
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.add(phase, (time.perf_counter() - started) * 1000, error, **fields)
+
+    def summary(self):
+        """Wall-clock total plus per-phase totals, attached to the test's result"""
+        return {
+            'duration_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'phases': dict(self.totals),
+        }
+
+
+def format_phases(phases):
+    """'goto 1.20s · step 3.40s ...' in PHASES order"""
+    return ' · '.join(f"{name} {phases[name] / 1000:.2f}s" for name in PHASES if phases.get(name))
+
@@ -0,0 +1,177 @@
+import json
+import time
+from urllib.parse import urlparse
+
+# Default budgets (ms) per phase; a test case can override them with "waitBudgets"
+DEFAULT_BUDGETS = {
+    'after_submit': 5000,
+    'after_forgot_password': 2000,
+    'after_social': 3000,
+}
+
+# Where pages commonly put the message a rejected submit shows; a module's locators can add an error_message
+ERROR_SELECTORS = ('[role=alert]', '[aria-live]', '.error', '.error-message', '.invalid-feedback', '.toast', '[aria-invalid=true]')
+
+# Text each selector's visible matches show (or 'invalid' for an empty aria-invalid field), one string per selector
+_SHOWN_JS = """
+    const shown = selector => {
+        try {
+            return Array.from(document.querySelectorAll(selector)).filter(el => {
+                const rect = el.getBoundingClientRect();
+                return rect.width > 0 && rect.height > 0;
+            }).map(el => el.textContent.trim() || (el.getAttribute('aria-invalid') === 'true' ? 'invalid' : '')).filter(Boolean).join('\\n');
+        } catch (e) {
+            return '';
+        }
+    };"""
+
+# Taken just before a submit: what the selectors already show, and how often the browser's own validation
+# has blocked a submit so far ('invalid' events, which do not bubble, counted from the capture phase)
+SUBMIT_STATE_JS = """(selectors) => {""" + _SHOWN_JS + """
+    if (!window.__submitOutcome) {
+        window.__submitOutcome = {invalid: 0};
+        document.addEventListener('invalid', () => window.__submitOutcome.invalid++, true);
+    }
+    return {invalid: window.__submitOutcome.invalid, shown: selectors.map(shown)};
+}"""
+
+# The visible outcome of a submit, compared with the state before it: the page left start_path, the
+# browser's own validation blocked the form, or one of the selectors shows text it did not show before
+SUBMIT_OUTCOME_JS = """({startPath, selectors, before}) => {""" + _SHOWN_JS + """
+    if (location.pathname !== startPath) return true;
+    if (window.__submitOutcome && window.__submitOutcome.invalid !== before.invalid) return true;
+    return selectors.some((selector, i) => {
+        const now = shown(selector);
+        return now !== '' && now !== before.shown[i];
+    });
+}"""
+
+
+def plan_wait(test_case, phase, locators, start_url):
+    """Derive what to wait for after a step from the test case's function and expected fields"""
+    function_name = test_case.get('function', '').lower()
+    expected = ' '.join(test_case.get('expected', [])).lower()
+    budget = test_case.get('waitBudgets', {}).get(phase, DEFAULT_BUDGETS.get(phase, 2000))
+
+    if phase == 'after_submit':
+        if 'successful' in function_name or 'redirected' in expected:
+            return {'phase': phase, 'kind': 'url_change', 'target': start_url, 'budget_ms': budget}
+        # Invalid/empty inputs stay on the page: wait for the rejection to show (or a redirect after all)
+        selectors = list(ERROR_SELECTORS)
+        error_message = getattr(locators, 'error_message', None)
+        if error_message:
+            selectors.insert(0, error_message)
+        return {'phase': phase, 'kind': 'submit_outcome', 'target': start_url, 'selectors': selectors, 'budget_ms': min(budget, 1500)}
+
+    if phase == 'after_forgot_password':
+        modal_heading = getattr(locators, 'reset_password_heading', "h3:has-text('Reset Password')")
+        return {'phase': phase, 'kind': 'element_visible', 'target': modal_heading, 'budget_ms': budget}
+
+    if phase == 'after_social':
+        return {'phase': phase, 'kind': 'url_change', 'target': start_url, 'budget_ms': budget}
+
+    return {'phase': phase, 'kind': 'network_idle', 'target': None, 'budget_ms': budget}
+
+
+def _url_changed(start_url):
+    start_path = urlparse(start_url).path
+    return lambda url: urlparse(url).path != start_path
+
+
+def _outcome_arg(plan):
+    # Without a snapshot (see snapshot_wait) any shown message counts
+    before = plan.get('before') or {'invalid': 0, 'shown': []}
+    return {'startPath': urlparse(plan['target']).path, 'selectors': plan['selectors'], 'before': before}
+
+
+def snapshot_wait(page, plan):
+    """Record the state a submit_outcome wait compares against; call it just before the step the wait follows"""
+    if plan['kind'] != 'submit_outcome':
+        return
+    try:
+        plan['before'] = page.evaluate(SUBMIT_STATE_JS, plan['selectors'])
+    except Exception:
+        plan['before'] = None
+
+
+async def async_snapshot_wait(page, plan):
+    """Async counterpart of snapshot_wait"""
+    if plan['kind'] != 'submit_outcome':
+        return
+    try:
+        plan['before'] = await page.evaluate(SUBMIT_STATE_JS, plan['selectors'])
+    except Exception:
+        plan['before'] = None
+
+
+class WaitRecorder:
+    """Collects how long each wait really took against its budget"""
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, plan, started, met, error=None):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        entry = {
+            'phase': plan['phase'],
+            'kind': plan['kind'],
+            'target': plan['target'],
+            'elapsed_ms': round(elapsed_ms, 1),
+            'budget_ms': plan['budget_ms'],
+            'met': met,
+        }
+        if error:
+            entry['error'] = error
+        self.records.append(entry)
+        return entry
+
+    def total_ms(self):
+        return sum(r['elapsed_ms'] for r in self.records)
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.records, f, indent=2)
+
+
+def log_waits(logger, recorder):
+    for r in recorder.records:
+        status = 'met' if r['met'] else 'not met'
+        message = f"Wait {r['phase']} ({r['kind']}): {r['elapsed_ms']:.0f}ms of {r['budget_ms']}ms budget, {status}"
+        if r['met']:
+            logger.info(message)
+        else:
+            logger.warning(message)
+
+
+def wait_for(page, plan, recorder):
+    """Wait until the planned condition holds or its budget runs out; never raises"""
+    started = time.perf_counter()
+    try:
+        if plan['kind'] == 'url_change':
+            page.wait_for_url(_url_changed(plan['target']), timeout=plan['budget_ms'])
+        elif plan['kind'] == 'element_visible':
+            page.locator(plan['target']).first.wait_for(state='visible', timeout=plan['budget_ms'])
+        elif plan['kind'] == 'submit_outcome':
+            page.wait_for_function(SUBMIT_OUTCOME_JS, arg=_outcome_arg(plan), timeout=plan['budget_ms'])
+        else:
+            page.wait_for_load_state('networkidle', timeout=plan['budget_ms'])
+        return recorder.record(plan, started, True)
+    except Exception as e:
+        return recorder.record(plan, started, False, str(e).splitlines()[0])
+
+
+async def async_wait_for(page, plan, recorder):
+    """Async counterpart of wait_for"""
+    started = time.perf_counter()
+    try:
+        if plan['kind'] == 'url_change':
+            await page.wait_for_url(_url_changed(plan['target']), timeout=plan['budget_ms'])
+        elif plan['kind'] == 'element_visible':
+            await page.locator(plan['target']).first.wait_for(state='visible', timeout=plan['budget_ms'])
+        elif plan['kind'] == 'submit_outcome':
+            await page.wait_for_function(SUBMIT_OUTCOME_JS, arg=_outcome_arg(plan), timeout=plan['budget_ms'])
+        else:
+            await page.wait_for_load_state('networkidle', timeout=plan['budget_ms'])
+        return recorder.record(plan, started, True)
+    except Exception as e:
+        return recorder.record(plan, started, False, str(e).splitlines()[0])